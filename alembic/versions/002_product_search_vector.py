@@ -0,0 +1,29 @@
+"""product full-text search vector
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,30 @@
+"""indexes for hot query paths
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_orders_payment_intent_id', 'orders', ['payment_intent_id'], unique=False)
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+    op.create_index('ix_products_category_id_price', 'products', ['category_id', 'price'], unique=False)
+    op.create_index('ix_products_price', 'products', ['price'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_price', table_name='products')
+    op.drop_index('ix_products_category_id_price', table_name='products')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_payment_intent_id', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders')
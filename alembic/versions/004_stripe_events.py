@@ -0,0 +1,38 @@
+"""stripe webhook event log
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stripe_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.String(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_id')
+    )
+    op.create_index(op.f('ix_stripe_events_id'), 'stripe_events', ['id'], unique=False)
+    op.create_index('ix_stripe_events_status_id', 'stripe_events', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stripe_events_status_id', table_name='stripe_events')
+    op.drop_index(op.f('ix_stripe_events_id'), table_name='stripe_events')
+    op.drop_table('stripe_events')
@@ -0,0 +1,22 @@
+"""index orders by creation time for exports
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
@@ -0,0 +1,64 @@
+"""daily sales rollups
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-04-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table(
+        'sales_daily_products',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_index('ix_sales_daily_products_product_id_day', 'sales_daily_products', ['product_id', 'day'], unique=False)
+    op.create_table(
+        'sales_daily_categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sales_daily_categories_day_category_id', 'sales_daily_categories', ['day', 'category_id'], unique=False)
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_sales_daily_categories_day_category_id', table_name='sales_daily_categories')
+    op.drop_table('sales_daily_categories')
+    op.drop_index('ix_sales_daily_products_product_id_day', table_name='sales_daily_products')
+    op.drop_table('sales_daily_products')
+    op.drop_table('sales_daily')
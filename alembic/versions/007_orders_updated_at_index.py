@@ -0,0 +1,22 @@
+"""index orders by update time for rollup refreshes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-04-08 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_updated_at', 'orders', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_updated_at', table_name='orders')
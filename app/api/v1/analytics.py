@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+
+from app.db.session import get_db
+from app.db.models.user import User
+from app.schemas.analytics import (
+    SalesSummaryResponse,
+    ProductSalesResponse,
+    CategorySalesResponse,
+    RollupRefreshResponse
+)
+from app.core.dependencies import get_current_admin
+from app.core.utils import raise_bad_request
+from app.services.analytics_service import SalesRollupService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+MAX_RANGE_DAYS = 366
+
+
+def resolve_range(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise_bad_request("date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise_bad_request(f"Date range is limited to {MAX_RANGE_DAYS} days")
+    return date_from, date_to
+
+
+@router.get("/sales", response_model=SalesSummaryResponse)
+async def get_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    date_from, date_to = resolve_range(date_from, date_to)
+    days = await SalesRollupService.daily_sales(db, date_from, date_to)
+    totals = {
+        "orders": sum(day["orders"] for day in days),
+        "units": sum(day["units"] for day in days),
+        "revenue": sum((day["revenue"] for day in days), 0)
+    }
+    return {"date_from": date_from, "date_to": date_to, "totals": totals, "days": days}
+
+
+@router.get("/products", response_model=List[ProductSalesResponse])
+async def get_product_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    category_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    date_from, date_to = resolve_range(date_from, date_to)
+    return await SalesRollupService.product_sales(db, date_from, date_to, limit, category_id)
+
+
+@router.get("/categories", response_model=List[CategorySalesResponse])
+async def get_category_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    date_from, date_to = resolve_range(date_from, date_to)
+    return await SalesRollupService.category_sales(db, date_from, date_to)
+
+
+@router.post("/refresh", response_model=RollupRefreshResponse)
+async def refresh_rollups(
+    rebuild_from: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    return await SalesRollupService.refresh(db, rebuild_from)
@@ -6,14 +6,13 @@ from app.db.session import get_db
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, TokenRefresh
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     create_refresh_token,
     decode_token
 )
 from app.core.utils import raise_bad_request, raise_unauthorized
 from app.core.dependencies import get_current_user
+from app.services.password_service import password_service
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -31,7 +30,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
     new_user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_service.hash(user_data.password),
         full_name=user_data.full_name,
         is_active=True,
         is_admin=False
@@ -49,12 +48,20 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user:
+        raise_unauthorized("Incorrect email or password")
+
+    verified, new_hash = await password_service.verify_and_update(credentials.password, user.password_hash)
+    if not verified:
         raise_unauthorized("Incorrect email or password")
 
     if not user.is_active:
         raise_unauthorized("Account is inactive")
 
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
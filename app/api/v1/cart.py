@@ -3,19 +3,63 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import redis.asyncio as redis
 from decimal import Decimal
+from typing import Dict
 
 from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.product import Product
-from app.schemas.cart import CartItemAdd, CartItemUpdate, CartResponse, CartItem
+from app.schemas.cart import (
+    CartItemAdd,
+    CartItemUpdate,
+    CartResponse,
+    CartItem,
+    CartBatchRequest,
+    CartBatchLineResult,
+    CartBatchResponse
+)
 from app.core.dependencies import get_current_user, get_redis
 from app.core.utils import raise_not_found, raise_bad_request
+from app.core.config import settings
+from app.services.product_service import ProductService
+from app.services.cart_store import cart_store
+from app.services.inventory_service import inventory_store
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
 
-def get_cart_key(user_id: int) -> str:
-    return f"cart:user:{user_id}"
+def build_cart_response(cart_data: Dict[str, str], products: Dict[int, Product]) -> CartResponse:
+    items = []
+    total = Decimal("0")
+
+    for product_id_str, quantity_str in cart_data.items():
+        product = products.get(int(product_id_str))
+        if not product:
+            continue
+
+        quantity = int(quantity_str)
+        items.append(CartItem(
+            product_id=product.id,
+            quantity=quantity,
+            unit_price=product.price,
+            product_name=product.name
+        ))
+        total += product.price * quantity
+
+    return CartResponse(
+        items=items,
+        total=total,
+        item_count=len(items)
+    )
+
+
+async def load_product_stock(db: AsyncSession, product_id: int) -> int:
+    result = await db.execute(select(Product.stock).where(Product.id == product_id))
+    stock = result.scalar_one_or_none()
+
+    if stock is None:
+        raise_not_found("Product", product_id)
+
+    return stock
 
 
 @router.get("/health")
@@ -29,33 +73,10 @@ async def get_cart(
     redis_client: redis.Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_db)
 ):
-    cart_key = get_cart_key(current_user.id)
-    cart_data = await redis_client.hgetall(cart_key)
-
-    items = []
-    total = Decimal("0")
-
-    for product_id_str, quantity_str in cart_data.items():
-        product_id = int(product_id_str)
-        quantity = int(quantity_str)
+    cart_data = await cart_store.get_items(redis_client, current_user.id)
+    products = await ProductService.get_products_by_ids(db, cart_data.keys())
 
-        result = await db.execute(select(Product).where(Product.id == product_id))
-        product = result.scalar_one_or_none()
-
-        if product:
-            items.append(CartItem(
-                product_id=product.id,
-                quantity=quantity,
-                unit_price=product.price,
-                product_name=product.name
-            ))
-            total += product.price * quantity
-
-    return CartResponse(
-        items=items,
-        total=total,
-        item_count=len(items)
-    )
+    return build_cart_response(cart_data, products)
 
 
 @router.post("/items", status_code=201)
@@ -65,29 +86,58 @@ async def add_to_cart(
     redis_client: redis.Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Product).where(Product.id == item.product_id))
-    product = result.scalar_one_or_none()
-
-    if not product:
-        raise_not_found("Product", item.product_id)
-
-    if product.stock < item.quantity:
+    if settings.INVENTORY_RESERVATIONS_ENABLED:
+        new_quantity = await inventory_store.reserve(
+            redis_client, current_user.id, item.product_id, item.quantity, "add",
+            lambda: load_product_stock(db, item.product_id)
+        )
+    else:
+        stock = await load_product_stock(db, item.product_id)
+        if stock < item.quantity:
+            raise_bad_request("Insufficient stock")
+        new_quantity = await cart_store.add_item(redis_client, current_user.id, item.product_id, item.quantity, stock)
+
+    if new_quantity is None:
         raise_bad_request("Insufficient stock")
 
-    cart_key = get_cart_key(current_user.id)
-    current_qty = await redis_client.hget(cart_key, str(item.product_id))
-
-    new_quantity = item.quantity
-    if current_qty:
-        new_quantity += int(current_qty)
-
-    if product.stock < new_quantity:
-        raise_bad_request("Insufficient stock")
+    return {"message": "Item added to cart", "product_id": item.product_id, "quantity": new_quantity}
 
-    await redis_client.hset(cart_key, str(item.product_id), new_quantity)
-    await redis_client.expire(cart_key, 86400 * 7)
 
-    return {"message": "Item added to cart", "product_id": item.product_id, "quantity": new_quantity}
+@router.post("/items/batch", response_model=CartBatchResponse)
+async def add_to_cart_batch(
+    batch: CartBatchRequest,
+    current_user: User = Depends(get_current_user),
+    redis_client: redis.Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_db)
+):
+    products = await ProductService.get_products_by_ids(db, [item.product_id for item in batch.items])
+
+    results = []
+    lines = []
+    for item in batch.items:
+        product = products.get(item.product_id)
+        if not product:
+            results.append(CartBatchLineResult(product_id=item.product_id, status="not_found"))
+        elif item.quantity <= 0:
+            results.append(CartBatchLineResult(product_id=item.product_id, status="invalid_quantity"))
+        else:
+            results.append(CartBatchLineResult(product_id=item.product_id, status="ok"))
+            lines.append((len(results) - 1, item.product_id, item.quantity, product.stock))
+
+    if lines:
+        apply_items = inventory_store.reserve_items if settings.INVENTORY_RESERVATIONS_ENABLED else cart_store.apply_items
+        quantities = await apply_items(
+            redis_client, current_user.id, [line[1:] for line in lines], batch.mode
+        )
+        for (index, *_), quantity in zip(lines, quantities):
+            if quantity is None:
+                results[index].status = "insufficient_stock"
+            results[index].quantity = quantity
+
+    return CartBatchResponse(
+        results=results,
+        applied=sum(1 for result in results if result.status == "ok")
+    )
 
 
 @router.put("/items/{product_id}")
@@ -98,20 +148,20 @@ async def update_cart_item(
     redis_client: redis.Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
-
-    if not product:
-        raise_not_found("Product", product_id)
-
     if item_update.quantity <= 0:
         raise_bad_request("Quantity must be greater than 0")
 
-    if product.stock < item_update.quantity:
-        raise_bad_request("Insufficient stock")
+    if settings.INVENTORY_RESERVATIONS_ENABLED:
+        quantity = await inventory_store.reserve(
+            redis_client, current_user.id, product_id, item_update.quantity, "set",
+            lambda: load_product_stock(db, product_id)
+        )
+    else:
+        stock = await load_product_stock(db, product_id)
+        quantity = await cart_store.set_item(redis_client, current_user.id, product_id, item_update.quantity, stock)
 
-    cart_key = get_cart_key(current_user.id)
-    await redis_client.hset(cart_key, str(product_id), item_update.quantity)
+    if quantity is None:
+        raise_bad_request("Insufficient stock")
 
     return {"message": "Cart item updated", "product_id": product_id, "quantity": item_update.quantity}
 
@@ -122,8 +172,10 @@ async def remove_from_cart(
     current_user: User = Depends(get_current_user),
     redis_client: redis.Redis = Depends(get_redis)
 ):
-    cart_key = get_cart_key(current_user.id)
-    await redis_client.hdel(cart_key, str(product_id))
+    if settings.INVENTORY_RESERVATIONS_ENABLED:
+        await inventory_store.release(redis_client, current_user.id, product_id)
+    else:
+        await cart_store.remove_item(redis_client, current_user.id, product_id)
 
 
 @router.delete("", status_code=204)
@@ -131,5 +183,7 @@ async def clear_cart(
     current_user: User = Depends(get_current_user),
     redis_client: redis.Redis = Depends(get_redis)
 ):
-    cart_key = get_cart_key(current_user.id)
-    await redis_client.delete(cart_key)
+    if settings.INVENTORY_RESERVATIONS_ENABLED:
+        await inventory_store.release_all(redis_client, current_user.id)
+    else:
+        await cart_store.clear(redis_client, current_user.id)
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import selectinload
 import redis.asyncio as redis
-from typing import List
-from decimal import Decimal
+from typing import List, Literal, Optional
+from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_db, get_session_factory
 from app.db.models.user import User
 from app.db.models.order import Order, OrderItem
-from app.db.models.product import Product
-from app.schemas.order import OrderCreate, OrderResponse
-from app.core.dependencies import get_current_user, get_redis
+from app.schemas.order import OrderCreate, OrderResponse, OrderItemResponse
+from app.core.dependencies import get_current_user, get_current_admin, get_redis
 from app.core.utils import raise_not_found, raise_bad_request
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.serialization import JSONRowsResponse, response_columns, rows_to_dicts
+from app.services.checkout_service import CheckoutService
+from app.services.order_export import OrderExportService
+from app.services.cart_store import cart_store
+from app.services.inventory_service import inventory_store
+from app.core.config import settings
+from app.worker.tasks import enqueue_order_side_effects
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+ORDER_COLUMNS = response_columns(Order, OrderResponse)
+ORDER_ITEM_COLUMNS = response_columns(OrderItem, OrderItemResponse)
+
 
 @router.get("/health")
 async def health_check():
@@ -23,69 +35,29 @@ async def health_check():
 
 @router.post("", response_model=OrderResponse, status_code=201)
 async def create_order(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     redis_client: redis.Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_db)
 ):
-    cart_key = f"cart:user:{current_user.id}"
-    cart_data = await redis_client.hgetall(cart_key)
+    cart_data = await cart_store.get_items(redis_client, current_user.id)
 
     if not cart_data:
         raise_bad_request("Cart is empty")
 
-    total_amount = Decimal("0")
-    order_items_data = []
-
-    for product_id_str, quantity_str in cart_data.items():
-        product_id = int(product_id_str)
-        quantity = int(quantity_str)
-
-        result = await db.execute(select(Product).where(Product.id == product_id))
-        product = result.scalar_one_or_none()
-
-        if not product:
-            raise_bad_request(f"Product {product_id} not found")
-
-        if product.stock < quantity:
-            raise_bad_request(f"Insufficient stock for product {product.name}")
-
-        order_items_data.append({
-            "product_id": product_id,
-            "quantity": quantity,
-            "unit_price": product.price,
-            "product": product
-        })
-        total_amount += product.price * quantity
-
-    new_order = Order(
-        user_id=current_user.id,
-        total_amount=total_amount,
-        status="pending"
+    order = await CheckoutService.checkout(db, current_user.id, cart_data)
+    if settings.INVENTORY_RESERVATIONS_ENABLED:
+        await inventory_store.consume(redis_client, current_user.id, CheckoutService.parse_cart(cart_data))
+    else:
+        await cart_store.clear(redis_client, current_user.id)
+
+    background_tasks.add_task(
+        enqueue_order_side_effects,
+        current_user.email,
+        order.id,
+        float(order.total_amount),
+        [item.product_id for item in order.items]
     )
-    db.add(new_order)
-    await db.flush()
-
-    for item_data in order_items_data:
-        order_item = OrderItem(
-            order_id=new_order.id,
-            product_id=item_data["product_id"],
-            quantity=item_data["quantity"],
-            unit_price=item_data["unit_price"]
-        )
-        db.add(order_item)
-
-        product = item_data["product"]
-        product.stock -= item_data["quantity"]
-
-    await db.commit()
-    await db.refresh(new_order)
-
-    await redis_client.delete(cart_key)
-
-    result = await db.execute(
-        select(Order).where(Order.id == new_order.id)
-    )
-    order = result.scalar_one()
 
     return order
 
@@ -94,18 +66,68 @@ async def create_order(
 async def list_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    query = select(*ORDER_COLUMNS).where(Order.user_id == current_user.id)
+
+    if cursor:
+        position = decode_cursor("orders", cursor)
+        created_at = datetime.fromisoformat(position["created_at"])
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(created_at, position["id"]))
+    else:
+        query = query.offset(skip)
+
     result = await db.execute(
-        select(Order)
-        .where(Order.user_id == current_user.id)
-        .offset(skip)
+        query
+        .order_by(Order.created_at.desc(), Order.id.desc())
         .limit(limit)
-        .order_by(Order.created_at.desc())
     )
-    orders = result.scalars().all()
-    return orders
+    orders = rows_to_dicts(result.all())
+
+    if orders:
+        items_by_order = {order["id"]: order.setdefault("items", []) for order in orders}
+        result = await db.execute(
+            select(OrderItem.order_id, *ORDER_ITEM_COLUMNS)
+            .where(OrderItem.order_id.in_(items_by_order))
+            .order_by(OrderItem.id)
+        )
+        for item in rows_to_dicts(result.all()):
+            items_by_order[item.pop("order_id")].append(item)
+
+    headers = {}
+    if len(orders) == limit:
+        last = orders[-1]
+        headers["X-Next-Cursor"] = encode_cursor(
+            "orders", {"created_at": last["created_at"].isoformat(), "id": last["id"]}
+        )
+
+    return JSONRowsResponse(orders, headers=headers)
+
+
+@router.get("/export")
+async def export_orders(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    status: Optional[List[str]] = Query(None),
+    session_factory=Depends(get_session_factory),
+    current_admin: User = Depends(get_current_admin)
+):
+    query = OrderExportService.build_query(created_from, created_to, status)
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+
+    if export_format == "csv":
+        body, media_type = OrderExportService.to_csv(session_factory, query), "text/csv"
+    else:
+        body, media_type = OrderExportService.to_ndjson(session_factory, query), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders-{timestamp}.{export_format}"'}
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -115,7 +137,9 @@ async def get_order(
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
-        select(Order).where(Order.id == order_id, Order.user_id == current_user.id)
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.id == order_id, Order.user_id == current_user.id)
     )
     order = result.scalar_one_or_none()
 
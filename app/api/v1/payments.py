@@ -7,6 +7,7 @@ from app.db.models.user import User
 from app.db.models.order import Order
 from app.core.dependencies import get_current_user
 from app.services.payment_service import PaymentService
+from app.services.webhook_service import WebhookService, webhook_processor
 from app.core.utils import raise_not_found
 from pydantic import BaseModel
 
@@ -50,7 +51,8 @@ async def create_payment_intent(
         metadata={
             "order_id": str(order.id),
             "user_id": str(current_user.id)
-        }
+        },
+        idempotency_key=PaymentService.idempotency_key(order.id, order.created_at)
     )
 
     order.payment_intent_id = payment_intent.id
@@ -72,16 +74,7 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    if event["type"] == "payment_intent.succeeded":
-        payment_intent = event["data"]["object"]
-        order_id = payment_intent["metadata"].get("order_id")
-
-        if order_id:
-            result = await db.execute(select(Order).where(Order.id == int(order_id)))
-            order = result.scalar_one_or_none()
-
-            if order:
-                order.status = "paid"
-                await db.commit()
+    if await WebhookService.record_event(db, event, payload.decode()):
+        webhook_processor.notify()
 
     return {"status": "success"}
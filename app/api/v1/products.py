@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from typing import List, Optional
+from sqlalchemy import select
+from redis.exceptions import RedisError
+import redis.asyncio as redis
+from typing import List, Literal, Optional
+from datetime import datetime
 
 from app.db.session import get_db
 from app.db.models.product import Product, Category
@@ -11,13 +14,24 @@ from app.schemas.product import (
     ProductUpdate,
     ProductResponse,
     CategoryCreate,
-    CategoryResponse
+    CategoryResponse,
+    ProductImportResponse
 )
-from app.core.dependencies import get_current_admin
-from app.core.utils import raise_not_found
+from app.core.dependencies import get_current_admin, get_redis
+from app.core.utils import raise_not_found, raise_bad_request
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.serialization import JSONRowsResponse, JSONRowResponse, response_columns, rows_to_dicts, jsonable_rows
+from app.core.conditional import cache_entry, conditional_response
+from app.core.config import settings
+from app.services.product_cache import product_cache
+from app.services.search_service import search_backend
+from app.services.inventory_service import inventory_store
+from app.services.product_import import ProductImporter, detect_format
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+PRODUCT_COLUMNS = response_columns(Product, ProductResponse)
+
 
 @router.get("/health")
 async def health_check():
@@ -26,15 +40,57 @@ async def health_check():
 
 @router.get("", response_model=List[ProductResponse])
 async def list_products(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category_id: Optional[int] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Product)
+    if cursor and search:
+        raise_bad_request("Cursor pagination is not supported for search results")
+
+    after_id = decode_cursor("products", cursor)["id"] if cursor else None
+    if after_id is not None:
+        skip = 0
+
+    cache_key = product_cache.product_list_key({
+        "skip": skip,
+        "after_id": after_id,
+        "limit": limit,
+        "category_id": category_id,
+        "min_price": min_price,
+        "max_price": max_price,
+        "search": search
+    })
+    entry, fill = await product_cache.get_list(cache_key)
+    if entry is None:
+        products = await _query_products(db, skip, limit, after_id, category_id, min_price, max_price, search)
+        entry = cache_entry(products, JSONRowsResponse)
+        await product_cache.set_list(cache_key, entry, fill)
+
+    headers = {}
+    products = entry["data"]
+    if len(products) == limit and not search:
+        headers["X-Next-Cursor"] = encode_cursor("products", {"id": products[-1]["id"]})
+
+    return conditional_response(request, entry, JSONRowsResponse, settings.PRODUCT_LIST_CACHE_CONTROL, headers=headers)
+
+
+async def _query_products(
+    db: AsyncSession,
+    skip: int,
+    limit: int,
+    after_id: Optional[int],
+    category_id: Optional[int],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    search: Optional[str]
+) -> list:
+    query = select(*PRODUCT_COLUMNS)
 
     if category_id:
         query = query.where(Product.category_id == category_id)
@@ -42,30 +98,37 @@ async def list_products(
         query = query.where(Product.price >= min_price)
     if max_price:
         query = query.where(Product.price <= max_price)
+
     if search:
-        query = query.where(
-            or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.description.ilike(f"%{search}%")
-            )
-        )
-
-    query = query.offset(skip).limit(limit)
+        query = await search_backend.apply(db, query, search)
+        query = query.offset(skip)
+    elif after_id is not None:
+        query = query.where(Product.id > after_id).order_by(Product.id)
+    else:
+        query = query.offset(skip).order_by(Product.id)
+
+    query = query.limit(limit)
     result = await db.execute(query)
-    products = result.scalars().all()
-
-    return products
+    return jsonable_rows(rows_to_dicts(result.all()))
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    product = result.scalar_one_or_none()
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    cache_key = product_cache.product_key(product_id)
+    entry, fill = await product_cache.get(cache_key)
+    if entry is None:
+        result = await db.execute(select(Product).where(Product.id == product_id))
+        product = result.scalar_one_or_none()
 
-    if not product:
-        raise_not_found("Product", product_id)
+        if not product:
+            raise_not_found("Product", product_id)
 
-    return product
+        entry = cache_entry(ProductResponse.model_validate(product).model_dump(mode="json"), JSONRowResponse)
+        await product_cache.set(cache_key, entry, fill)
+
+    data = entry["data"]
+    last_modified = datetime.fromisoformat(data["updated_at"] or data["created_at"])
+    return conditional_response(request, entry, JSONRowResponse, settings.PRODUCT_CACHE_CONTROL, last_modified)
 
 
 @router.post("", response_model=ProductResponse, status_code=201)
@@ -78,14 +141,32 @@ async def create_product(
     db.add(new_product)
     await db.commit()
     await db.refresh(new_product)
+    await product_cache.invalidate_product(new_product.id)
+    search_backend.index_product(new_product)
 
     return new_product
 
 
+@router.post("/import", response_model=ProductImportResponse)
+async def import_products(
+    request: Request,
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    redis_client: redis.Redis = Depends(get_redis),
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    import_format = import_format or detect_format(request.headers.get("content-type"))
+    if import_format is None:
+        raise_bad_request("Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+
+    return await ProductImporter(db, import_format, redis_client).run(request.stream())
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: int,
     product_data: ProductUpdate,
+    redis_client: redis.Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
@@ -101,6 +182,13 @@ async def update_product(
 
     await db.commit()
     await db.refresh(product)
+    await product_cache.invalidate_product(product_id)
+    search_backend.index_product(product)
+    if "stock" in update_data:
+        try:
+            await inventory_store.sync(redis_client, {product_id: product.stock})
+        except RedisError:
+            pass
 
     return product
 
@@ -108,6 +196,7 @@ async def update_product(
 @router.delete("/{product_id}", status_code=204)
 async def delete_product(
     product_id: int,
+    redis_client: redis.Redis = Depends(get_redis),
     db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
@@ -119,13 +208,28 @@ async def delete_product(
 
     await db.delete(product)
     await db.commit()
+    await product_cache.invalidate_product(product_id)
+    search_backend.remove_product(product_id)
+    try:
+        await inventory_store.forget(redis_client, product_id)
+    except RedisError:
+        pass
 
 
 @router.get("/categories/list", response_model=List[CategoryResponse])
-async def list_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Category))
-    categories = result.scalars().all()
-    return categories
+async def list_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    cache_key = product_cache.categories_key()
+    entry, fill = await product_cache.get(cache_key)
+    if entry is None:
+        result = await db.execute(select(Category).order_by(Category.id))
+        categories = [
+            CategoryResponse.model_validate(category).model_dump(mode="json")
+            for category in result.scalars().all()
+        ]
+        entry = cache_entry(categories, JSONRowsResponse)
+        await product_cache.set(cache_key, entry, fill)
+
+    return conditional_response(request, entry, JSONRowsResponse, settings.CATEGORY_CACHE_CONTROL)
 
 
 @router.post("/categories", response_model=CategoryResponse, status_code=201)
@@ -138,5 +242,6 @@ async def create_category(
     db.add(new_category)
     await db.commit()
     await db.refresh(new_category)
+    await product_cache.invalidate_categories()
 
     return new_category
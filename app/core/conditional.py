@@ -0,0 +1,74 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Type
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ on the client's copy does not matter.
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution.
+    return last_modified.replace(microsecond=0) > since
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # When both are sent, If-Modified-Since is ignored (RFC 9110 13.2.2).
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        return not modified_since(if_modified_since, last_modified)
+    return False
+
+
+def cache_entry(data: Any, response_class: Type[Response]) -> dict:
+    # The ETag is hashed once, when the entry is cached, not on every request that serves it.
+    return {"data": data, "etag": strong_etag(response_class(data).body)}
+
+
+def conditional_response(
+    request: Request,
+    entry: dict,
+    response_class: Type[Response],
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+    headers: Optional[dict] = None
+) -> Response:
+    validators = {"ETag": entry["etag"], "Cache-Control": cache_control}
+    if last_modified is not None:
+        validators["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request, entry["etag"], last_modified):
+        return Response(status_code=304, headers=validators)
+    return response_class(entry["data"], headers={**(headers or {}), **validators})
@@ -6,8 +6,9 @@ import redis.asyncio as redis
 
 from app.db.session import get_db
 from app.db.models.user import User
-from app.core.security import decode_token
-from app.core.config import settings
+from app.core.security import decode_token_cached
+from app.core.principal_cache import principal_cache
+from app.core.redis_pool import get_redis_client
 from app.core.utils import raise_unauthorized
 
 security = HTTPBearer()
@@ -18,7 +19,7 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db)
 ) -> User:
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
 
     if payload is None or payload.get("type") != "access":
         raise_unauthorized()
@@ -27,8 +28,12 @@ async def get_current_user(
     if user_id is None:
         raise_unauthorized()
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    user, version = await principal_cache.get(int(user_id))
+    if user is None:
+        result = await db.execute(select(User).where(User.id == int(user_id)))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await principal_cache.set(user, version)
 
     if user is None or not user.is_active:
         raise_unauthorized()
@@ -46,8 +51,4 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
 
 
 async def get_redis() -> redis.Redis:
-    client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-    try:
-        yield client
-    finally:
-        await client.close()
+    yield get_redis_client()
@@ -0,0 +1,196 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds", "redis_commands", "redis_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.redis_commands = 0
+        self.redis_seconds = 0.0
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...], label_names: Tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            base = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{{{base},le=\"{bound}\"}} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{{{base},le=\"+Inf\"}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "HTTP request latency by route",
+            LATENCY_BUCKETS, ("method", "route", "status")
+        )
+        self.request_db_queries = Histogram(
+            "http_request_db_queries", "Database queries issued per request",
+            QUERY_COUNT_BUCKETS, ("method", "route")
+        )
+        self.db_seconds = Counter("db_query_seconds_total", "Time spent in database queries", ("method", "route"))
+        self.redis_commands = Counter("redis_commands_total", "Redis commands issued", ("method", "route"))
+        self.redis_seconds = Counter("redis_command_seconds_total", "Time spent in Redis commands", ("method", "route"))
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            self.request_latency.observe((method, route, str(status)), seconds)
+            self.request_db_queries.observe((method, route), stats.db_queries)
+            self.db_seconds.inc((method, route), stats.db_seconds)
+            self.redis_commands.inc((method, route), stats.redis_commands)
+            self.redis_seconds.inc((method, route), stats.redis_seconds)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (
+                self.request_latency, self.request_db_queries,
+                self.db_seconds, self.redis_commands, self.redis_seconds
+            ):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def record_redis_command(count: int, seconds: float):
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.redis_commands += count
+        stats.redis_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_times"].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_times"):
+        connection.info["query_start_times"].pop()
+
+
+def instrument_engine(engine: AsyncEngine):
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing_header(stats, time.perf_counter() - start).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            metrics_registry.record_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start,
+                stats
+            )
+
+
+def server_timing_header(stats: RequestStats, seconds: float) -> str:
+    return ", ".join((
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.db_queries} queries"',
+        f'redis;dur={stats.redis_seconds * 1000:.2f};desc="{stats.redis_commands} commands"',
+        f"app;dur={seconds * 1000:.2f}"
+    ))
@@ -0,0 +1,37 @@
+import base64
+import hashlib
+import hmac
+import json
+from typing import Any, Dict
+
+from app.core.config import settings
+from app.core.utils import raise_bad_request
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(settings.JWT_SECRET.encode(), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def encode_cursor(kind: str, values: Dict[str, Any]) -> str:
+    payload = json.dumps({"k": kind, **values}, separators=(",", ":"), default=str).encode()
+    return f"{base64.urlsafe_b64encode(payload).rstrip(b'=').decode()}.{_sign(payload)}"
+
+
+def decode_cursor(kind: str, cursor: str) -> Dict[str, Any]:
+    try:
+        encoded_payload, signature = cursor.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        if not hmac.compare_digest(signature, _sign(payload)):
+            raise ValueError("bad signature")
+        values = json.loads(payload)
+    except (ValueError, TypeError):
+        raise_bad_request("Invalid cursor")
+
+    if values.pop("k", None) != kind:
+        raise_bad_request("Invalid cursor")
+    return values
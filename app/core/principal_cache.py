@@ -0,0 +1,153 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+import redis.asyncio as redis
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import MissingGreenlet
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.redis_pool import get_redis_client
+from app.db.models.user import User
+
+PRINCIPAL_FIELDS = ("id", "email", "full_name", "is_active", "is_admin", "created_at", "updated_at")
+INVALIDATING_FIELDS = ("is_active", "is_admin", "email", "password_hash")
+PENDING_INVALIDATIONS = "principal_cache_invalidations"
+
+
+class PrincipalCache:
+    def __init__(
+        self,
+        ttl_seconds: int = settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+        max_entries: int = settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+        use_redis: bool = settings.AUTH_PRINCIPAL_CACHE_REDIS
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self.local = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._redis: Optional[redis.Redis] = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        return self._redis or get_redis_client()
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"auth:principal:{user_id}"
+
+    @staticmethod
+    def version_key(user_id: int) -> str:
+        return f"auth:principal:{user_id}:version"
+
+    @staticmethod
+    def to_user(data: dict) -> User:
+        return User(**data)
+
+    async def get(self, user_id: int) -> Tuple[Optional[User], Optional[str]]:
+        # Every lookup reads the user's version, which any worker bumps when it commits a change to
+        # the principal; entries are only served while it is unchanged. The version is also returned
+        # for set(), so a row read before an invalidation is never cached under the newer version.
+        if self.ttl_seconds <= 0:
+            return None, None
+
+        key = self.key(user_id)
+        try:
+            if self.use_redis:
+                raw, version = await self.redis.mget(key, self.version_key(user_id))
+            else:
+                raw, version = None, await self.redis.get(self.version_key(user_id))
+            version = version or "0"
+        except redis.RedisError:
+            # Without Redis, local entries are bounded by the TTL alone.
+            raw, version = None, None
+
+        entry = self.local.get(key)
+        if entry is not None and (version is None or entry["version"] == version):
+            return self.to_user(entry["data"]), version
+
+        if raw is not None:
+            entry = json.loads(raw)
+            if entry["version"] == version:
+                data = entry["data"]
+                for field in ("created_at", "updated_at"):
+                    if data[field] is not None:
+                        data[field] = datetime.fromisoformat(data[field])
+                self.local.set(key, entry)
+                return self.to_user(data), version
+
+        return None, version
+
+    async def set(self, user: User, version: Optional[str]):
+        if self.ttl_seconds <= 0:
+            return
+
+        entry = {"version": version, "data": {field: getattr(user, field) for field in PRINCIPAL_FIELDS}}
+        key = self.key(user.id)
+        self.local.set(key, entry)
+        if self.use_redis and version is not None:
+            try:
+                await self.redis.set(key, json.dumps(entry, default=datetime.isoformat), ex=self.ttl_seconds)
+            except redis.RedisError:
+                pass
+
+    async def invalidate(self, user_id: int):
+        self.local.delete(self.key(user_id))
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(self.version_key(user_id))
+                if self.use_redis:
+                    pipe.delete(self.key(user_id))
+                await pipe.execute()
+        except redis.RedisError:
+            pass
+
+    def clear(self):
+        self.local.clear()
+
+
+principal_cache = PrincipalCache()
+_pending_invalidations = set()
+
+
+@event.listens_for(User, "after_update")
+def _queue_principal_invalidation(mapper, connection, target: User):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in INVALIDATING_FIELDS):
+        return
+    # Invalidating during flush would let a concurrent request re-cache the old row before commit.
+    state.session.info.setdefault(PENDING_INVALIDATIONS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session: Session):
+    user_ids = session.info.pop(PENDING_INVALIDATIONS, None)
+    if not user_ids:
+        return
+
+    for user_id in user_ids:
+        principal_cache.local.delete(principal_cache.key(user_id))
+
+    async def invalidate():
+        for user_id in user_ids:
+            await principal_cache.invalidate(user_id)
+
+    coroutine = invalidate()
+    try:
+        # AsyncSession commits inside a greenlet, so the version bump lands before commit() returns.
+        await_only(coroutine)
+    except MissingGreenlet:
+        try:
+            task = asyncio.get_running_loop().create_task(coroutine)
+        except RuntimeError:
+            coroutine.close()
+            return
+        _pending_invalidations.add(task)
+        task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_invalidations(session: Session):
+    session.info.pop(PENDING_INVALIDATIONS, None)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.metrics import record_redis_command
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional["InstrumentedConnectionPool"] = None
+
+
+class InstrumentedConnectionPool(redis.ConnectionPool):
+    # Waits up to `timeout` for a free connection when all max_connections are in use, instead of
+    # failing the command with "Too many connections", and keeps its own counters for /health/redis.
+    # (redis-py 5.0's BlockingConnectionPool deadlocks when a connect fails while it holds its lock.)
+    def __init__(self, *args, timeout: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._slots = asyncio.BoundedSemaphore(self.max_connections)
+        self.created = 0
+        self.in_use = 0
+        self.timeouts = 0
+
+    def reset(self):
+        super().reset()
+        self._reset_counters()
+
+    def make_connection(self):
+        self.created += 1
+        return super().make_connection()
+
+    async def get_connection(self, command_name, *keys, **options):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise redis.ConnectionError("No connection available") from None
+        self.in_use += 1
+        # If connecting fails, the base class hands the connection back through release(), freeing the slot.
+        return await super().get_connection(command_name, *keys, **options)
+
+    async def release(self, connection):
+        await super().release(connection)
+        self.in_use -= 1
+        self._slots.release()
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        commands = len(self.command_stack)
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            record_redis_command(commands, time.perf_counter() - start)
+
+
+class InstrumentedRedis(redis.Redis):
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis_command(1, time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def create_redis_pool(max_connections: int = settings.REDIS_MAX_CONNECTIONS) -> InstrumentedConnectionPool:
+    return InstrumentedConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=max_connections,
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+        encoding="utf-8",
+        decode_responses=True
+    )
+
+
+def get_redis_pool() -> InstrumentedConnectionPool:
+    global _pool
+    if _pool is None:
+        _pool = create_redis_pool()
+    return _pool
+
+
+def get_redis_client() -> redis.Redis:
+    return InstrumentedRedis(connection_pool=get_redis_pool())
+
+
+def create_redis_client(max_connections: int = 1) -> redis.Redis:
+    # A standalone client for code running on its own event loop (Celery tasks); the shared
+    # pool's connections are bound to the API loop that opened them.
+    return InstrumentedRedis(connection_pool=create_redis_pool(max_connections))
+
+
+async def init_redis_pool():
+    client = get_redis_client()
+    try:
+        await client.ping()
+    except redis.RedisError as e:
+        logger.warning("Redis is not reachable at startup: %s", e)
+
+
+async def close_redis_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
+
+
+def redis_pool_stats() -> dict:
+    pool = get_redis_pool()
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": pool.in_use,
+        "available": pool.created - pool.in_use,
+        "created": pool.created,
+        "timeouts": pool.timeouts
+    }
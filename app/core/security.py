@@ -1,10 +1,14 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import LRUCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS)
+token_cache = LRUCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -40,3 +44,17 @@ def decode_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = decode_token(token)
+    if payload is not None and "exp" in payload:
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl_seconds=ttl)
+    return payload
@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Type
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+
+rows_adapter = TypeAdapter(List[Dict[str, Any]])
+row_adapter = TypeAdapter(Dict[str, Any])
+
+
+def response_columns(model, schema: Type[BaseModel]) -> list:
+    return [getattr(model, name) for name in schema.model_fields if name in model.__table__.c]
+
+
+def rows_to_dicts(rows: List[Row]) -> List[dict]:
+    return [row._asdict() for row in rows]
+
+
+def jsonable_rows(rows: List[dict]) -> List[dict]:
+    return rows_adapter.dump_python(rows, mode="json")
+
+
+class JSONRowsResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: List[dict]) -> bytes:
+        return rows_adapter.dump_json(content)
+
+
+class JSONRowResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: dict) -> bytes:
+        return row_adapter.dump_json(content)
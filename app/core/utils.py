@@ -23,3 +23,15 @@ def raise_forbidden(detail: str = "Forbidden"):
 
 def raise_bad_request(detail: str):
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def raise_not_implemented(detail: str):
+    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=detail)
+
+
+def raise_service_unavailable(detail: str, retry_after: int = 1):
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(retry_after)},
+    )
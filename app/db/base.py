@@ -2,3 +2,5 @@ from app.db.session import Base
 from app.db.models.user import User
 from app.db.models.product import Product, Category
 from app.db.models.order import Order, OrderItem
+from app.db.models.payment_event import StripeEvent
+from app.db.models.analytics import DailySales, DailyProductSales, DailyCategorySales, RollupWatermark
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class DailySales(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class DailyProductSales(Base):
+    __tablename__ = "sales_daily_products"
+    __table_args__ = (
+        Index("ix_sales_daily_products_product_id_day", "product_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    category_id = Column(Integer, nullable=True)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class DailyCategorySales(Base):
+    __tablename__ = "sales_daily_categories"
+    __table_args__ = (
+        Index("ix_sales_daily_categories_day_category_id", "day", "category_id"),
+    )
+
+    # Surrogate key because uncategorized sales roll up under a NULL category_id.
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, nullable=True)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, Text, DateTime, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -15,6 +15,10 @@ class Category(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_category_id_price", "category_id", "price"),
+        Index("ix_products_price", "price"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String, unique=True, nullable=False, index=True)
@@ -28,3 +32,23 @@ class Product(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     category = relationship("Category")
+
+
+PRODUCT_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
+event.listen(
+    Product.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE products ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({PRODUCT_SEARCH_VECTOR_SQL}) STORED"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    Product.__table__,
+    "after_create",
+    DDL("CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)").execute_if(dialect="postgresql")
+)
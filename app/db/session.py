@@ -1,8 +1,36 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool
+from app.core.metrics import instrument_engine
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+
+def build_engine_options(database_url: str) -> dict:
+    options = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
+    if make_url(database_url).get_backend_name() == "postgresql":
+        options.update({
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "connect_args": {
+                "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+        })
+
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL))
+instrument_engine(engine)
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -10,6 +38,10 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def get_session_factory() -> async_sessionmaker:
+    return AsyncSessionLocal
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
@@ -1,14 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from redis.exceptions import RedisError
+
+from app.api.v1 import auth, products, cart, orders, payments, analytics
+from app.core.redis_pool import init_redis_pool, close_redis_pool, get_redis_client, redis_pool_stats
+from app.db.session import engine, AsyncSessionLocal
+from app.db.pool import pool_stats
+from app.core.metrics import MetricsMiddleware, metrics_registry
+from app.services.password_service import password_service
+from app.services.cart_store import cart_store
+from app.services.stripe_gateway import stripe_gateway
+from app.services.webhook_service import webhook_processor
+from app.services.inventory_service import inventory_store
+from app.services.analytics_service import SalesRollupService
+from app.core.config import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_redis_pool()
+    try:
+        await cart_store.load_scripts(get_redis_client())
+        await inventory_store.load_scripts(get_redis_client())
+    except RedisError:
+        pass
+    if settings.WEBHOOK_WORKER_ENABLED:
+        webhook_processor.start()
+    yield
+    await webhook_processor.stop()
+    await close_redis_pool()
+    await engine.dispose()
+    password_service.shutdown()
+    await stripe_gateway.close()
 
-from app.api.v1 import auth, products, cart, orders, payments
 
 app = FastAPI(
     title="E-commerce API",
     description="Production-ready FastAPI-based e-commerce backend",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -17,8 +52,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
 
 @app.get("/")
 async def root():
@@ -35,11 +74,55 @@ async def health():
     return {"status": "healthy", "service": "api-gateway"}
 
 
+@app.get("/health/redis")
+async def redis_health():
+    try:
+        await get_redis_client().ping()
+        status = "healthy"
+    except Exception:
+        status = "unhealthy"
+    return {"status": status, "service": "redis", "pool": redis_pool_stats()}
+
+
+@app.get("/health/db")
+async def db_health():
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        status = "healthy"
+    except Exception:
+        status = "unhealthy"
+    return {"status": status, "service": "database", "pool": pool_stats(engine.pool)}
+
+
+@app.get("/health/webhooks")
+async def webhook_health():
+    return {"status": "healthy", "service": "stripe-webhooks", "processor": webhook_processor.metrics.snapshot()}
+
+
+@app.get("/health/analytics")
+async def analytics_health():
+    try:
+        async with AsyncSessionLocal() as db:
+            rollups = await SalesRollupService.status(db)
+        status = "healthy"
+    except Exception:
+        rollups = None
+        status = "unhealthy"
+    return {"status": status, "service": "analytics", "rollups": rollups}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(products.router, prefix="/api/v1")
 app.include_router(cart.router, prefix="/api/v1")
 app.include_router(orders.router, prefix="/api/v1")
 app.include_router(payments.router, prefix="/api/v1")
+app.include_router(analytics.router, prefix="/api/v1")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Optional
+from decimal import Decimal
+
+
+class SalesTotals(BaseModel):
+    orders: int
+    units: int
+    revenue: Decimal
+
+
+class DailySalesResponse(SalesTotals):
+    day: date
+
+
+class SalesSummaryResponse(BaseModel):
+    date_from: date
+    date_to: date
+    totals: SalesTotals
+    days: List[DailySalesResponse]
+
+
+class ProductSalesResponse(SalesTotals):
+    product_id: int
+
+
+class CategorySalesResponse(SalesTotals):
+    category_id: Optional[int] = None
+
+
+class RollupRefreshResponse(BaseModel):
+    first_day: Optional[date] = None
+    last_day: Optional[date] = None
+    days: int
+    watermark: Optional[datetime] = None
@@ -1,9 +1,15 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from decimal import Decimal
 
 
 class CartItemAdd(BaseModel):
+    product_id: int
+    quantity: int = Field(1, gt=0)
+
+
+class CartBatchItem(BaseModel):
+    # Not validated here: the batch endpoint reports bad quantities per line as invalid_quantity.
     product_id: int
     quantity: int = 1
 
@@ -23,3 +29,19 @@ class CartResponse(BaseModel):
     items: List[CartItem]
     total: Decimal
     item_count: int
+
+
+class CartBatchRequest(BaseModel):
+    items: List[CartBatchItem] = Field(..., min_length=1, max_length=100)
+    mode: Literal["add", "set"] = "add"
+
+
+class CartBatchLineResult(BaseModel):
+    product_id: int
+    status: Literal["ok", "not_found", "insufficient_stock", "invalid_quantity"]
+    quantity: Optional[int] = None
+
+
+class CartBatchResponse(BaseModel):
+    results: List[CartBatchLineResult]
+    applied: int
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -51,3 +51,23 @@ class ProductResponse(ProductBase):
 
     class Config:
         from_attributes = True
+
+
+class ProductImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    errors: List[str]
+
+
+class ProductImportResponse(BaseModel):
+    format: str
+    rows: int
+    inserted: int
+    updated: int
+    failed: int
+    superseded: int
+    aborted: bool
+    errors: List[ProductImportError]
+    errors_truncated: bool
+    elapsed_seconds: float
+    rows_per_second: float
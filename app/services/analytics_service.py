@@ -0,0 +1,198 @@
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import Date, delete, func, insert, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.serialization import rows_to_dicts
+from app.db.models.analytics import DailySales, DailyProductSales, DailyCategorySales, RollupWatermark
+from app.db.models.order import Order, OrderItem
+from app.db.models.product import Product
+
+ROLLUP_NAME = "sales_daily"
+ROLLUP_LOCK_ID = 72100
+ROLLUP_TABLES = (DailySales, DailyProductSales, DailyCategorySales)
+# Only orders whose payment went through count as sales.
+REALISED_ORDER_STATUSES = ("paid",)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, day_time.min, tzinfo=timezone.utc)
+
+
+def order_day(dialect_name: str):
+    # Rollup days are UTC calendar days whatever the session time zone is.
+    if dialect_name == "postgresql":
+        return type_coerce(func.date(func.timezone("UTC", Order.created_at)), Date).label("day")
+    return type_coerce(func.date(Order.created_at), Date).label("day")
+
+
+def day_ranges(days: Iterable[date]) -> List[Tuple[date, date]]:
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+class SalesRollupService:
+    @staticmethod
+    async def rebuild_days(db: AsyncSession, first_day: date, last_day: date):
+        # Whole days are recomputed rather than incremented, so re-running a window is idempotent
+        # and orders that commit late are picked up on the next pass.
+        day = order_day(db.get_bind().dialect.name)
+        in_window = (Order.created_at >= day_start(first_day), Order.created_at < day_start(last_day + timedelta(days=1)))
+        orders = func.count(func.distinct(Order.id))
+        units = func.sum(OrderItem.quantity)
+        revenue = func.sum(OrderItem.quantity * OrderItem.unit_price)
+        items = (
+            select()
+            .select_from(Order)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .where(*in_window, Order.status.in_(REALISED_ORDER_STATUSES))
+        )
+
+        for table in ROLLUP_TABLES:
+            await db.execute(delete(table).where(table.day >= first_day, table.day <= last_day))
+
+        await db.execute(insert(DailySales).from_select(
+            ["day", "orders", "units", "revenue"],
+            items.add_columns(day, orders, units, revenue).group_by(day)
+        ))
+        by_product = items.outerjoin(Product, Product.id == OrderItem.product_id)
+        await db.execute(insert(DailyProductSales).from_select(
+            ["day", "product_id", "category_id", "orders", "units", "revenue"],
+            by_product.add_columns(day, OrderItem.product_id, Product.category_id, orders, units, revenue)
+            .group_by(day, OrderItem.product_id, Product.category_id)
+        ))
+        await db.execute(insert(DailyCategorySales).from_select(
+            ["day", "category_id", "orders", "units", "revenue"],
+            by_product.add_columns(day, Product.category_id, orders, units, revenue)
+            .group_by(day, Product.category_id)
+        ))
+
+    @staticmethod
+    async def refresh(
+        db: AsyncSession,
+        rebuild_from: Optional[date] = None,
+        lag_seconds: int = settings.ANALYTICS_REFRESH_LAG_SECONDS
+    ) -> dict:
+        if db.get_bind().dialect.name == "postgresql":
+            # Only one refresh rebuilds at a time, even if several are triggered.
+            await db.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_ID)))
+
+        started = _utc((await db.execute(select(func.now()))).scalar())
+        state = await db.get(RollupWatermark, ROLLUP_NAME)
+        watermark = _utc(state.watermark) if state is not None else None
+        result = await db.execute(select(func.min(Order.created_at), func.max(Order.created_at)))
+        oldest, newest = (_utc(value) for value in result.one())
+
+        lag = timedelta(seconds=lag_seconds)
+        days = set()
+        if newest is None:
+            first_day = None
+        elif rebuild_from is not None:
+            first_day = rebuild_from
+        elif watermark is None:
+            first_day = oldest.date()
+        elif newest <= watermark and started - watermark > lag:
+            # Nothing new and nothing recent enough to still be committing.
+            first_day = None
+        else:
+            first_day = (watermark - lag).date()
+        if first_day is not None:
+            days.update(first_day + timedelta(days=offset) for offset in range((newest.date() - first_day).days + 1))
+
+        if state is not None and state.refreshed_at is not None:
+            # Status changes (pending -> paid) do not move the created_at watermark, so also
+            # rebuild the days of orders updated since the last refresh.
+            day = order_day(db.get_bind().dialect.name)
+            result = await db.execute(
+                select(day).where(Order.updated_at >= _utc(state.refreshed_at) - lag).distinct()
+            )
+            days.update(result.scalars().all())
+
+        for first, last in day_ranges(days):
+            await SalesRollupService.rebuild_days(db, first, last)
+
+        if newest is not None and (watermark is None or newest > watermark):
+            watermark = newest
+        if state is None:
+            db.add(RollupWatermark(name=ROLLUP_NAME, watermark=watermark, refreshed_at=started))
+        else:
+            state.watermark = watermark
+            state.refreshed_at = started
+        await db.commit()
+        return {
+            "first_day": min(days) if days else None,
+            "last_day": max(days) if days else None,
+            "days": len(days),
+            "watermark": watermark
+        }
+
+    @staticmethod
+    async def status(db: AsyncSession) -> dict:
+        state = await db.get(RollupWatermark, ROLLUP_NAME)
+        return {
+            "watermark": state.watermark.isoformat() if state and state.watermark else None,
+            "refreshed_at": state.refreshed_at.isoformat() if state and state.refreshed_at else None
+        }
+
+    @staticmethod
+    async def daily_sales(db: AsyncSession, date_from: date, date_to: date) -> List[dict]:
+        result = await db.execute(
+            select(DailySales.day, DailySales.orders, DailySales.units, DailySales.revenue)
+            .where(DailySales.day >= date_from, DailySales.day <= date_to)
+            .order_by(DailySales.day)
+        )
+        return rows_to_dicts(result.all())
+
+    @staticmethod
+    async def product_sales(
+        db: AsyncSession,
+        date_from: date,
+        date_to: date,
+        limit: int,
+        category_id: Optional[int] = None
+    ) -> List[dict]:
+        revenue = func.sum(DailyProductSales.revenue).label("revenue")
+        query = (
+            select(
+                DailyProductSales.product_id,
+                func.sum(DailyProductSales.orders).label("orders"),
+                func.sum(DailyProductSales.units).label("units"),
+                revenue
+            )
+            .where(DailyProductSales.day >= date_from, DailyProductSales.day <= date_to)
+            .group_by(DailyProductSales.product_id)
+            .order_by(revenue.desc(), DailyProductSales.product_id)
+            .limit(limit)
+        )
+        if category_id is not None:
+            query = query.where(DailyProductSales.category_id == category_id)
+        result = await db.execute(query)
+        return rows_to_dicts(result.all())
+
+    @staticmethod
+    async def category_sales(db: AsyncSession, date_from: date, date_to: date) -> List[dict]:
+        revenue = func.sum(DailyCategorySales.revenue).label("revenue")
+        result = await db.execute(
+            select(
+                DailyCategorySales.category_id,
+                func.sum(DailyCategorySales.orders).label("orders"),
+                func.sum(DailyCategorySales.units).label("units"),
+                revenue
+            )
+            .where(DailyCategorySales.day >= date_from, DailyCategorySales.day <= date_to)
+            .group_by(DailyCategorySales.category_id)
+            .order_by(revenue.desc())
+        )
+        return rows_to_dicts(result.all())
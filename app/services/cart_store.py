@@ -0,0 +1,106 @@
+import hashlib
+from typing import Dict, List, Optional, Tuple
+import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+from app.core.config import settings
+
+# KEYS[1] cart hash; ARGV product id, quantity to add, stock cap, ttl.
+# Returns the new quantity, or -1 if it would exceed the cap.
+ADD_ITEM_SCRIPT = """
+local quantity = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0') + tonumber(ARGV[2])
+if quantity > tonumber(ARGV[3]) then
+    return -1
+end
+redis.call('HSET', KEYS[1], ARGV[1], quantity)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return quantity
+"""
+
+# KEYS[1] cart hash; ARGV product id, quantity, stock cap, ttl.
+SET_ITEM_SCRIPT = """
+local quantity = tonumber(ARGV[2])
+if quantity > tonumber(ARGV[3]) then
+    return -1
+end
+redis.call('HSET', KEYS[1], ARGV[1], quantity)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return quantity
+"""
+
+# KEYS[1] cart hash; ARGV product id, ttl. Returns the number of fields removed.
+REMOVE_ITEM_SCRIPT = """
+local removed = redis.call('HDEL', KEYS[1], ARGV[1])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return removed
+"""
+
+
+class CartStore:
+    scripts = {
+        "add": ADD_ITEM_SCRIPT,
+        "set": SET_ITEM_SCRIPT,
+        "remove": REMOVE_ITEM_SCRIPT
+    }
+
+    def __init__(self, ttl_seconds: int = settings.CART_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.shas = {name: hashlib.sha1(script.encode()).hexdigest() for name, script in self.scripts.items()}
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"cart:user:{user_id}"
+
+    async def load_scripts(self, client: redis.Redis):
+        for name, script in self.scripts.items():
+            self.shas[name] = await client.script_load(script)
+
+    async def _call(self, client: redis.Redis, name: str, key: str, *args) -> int:
+        try:
+            return int(await client.evalsha(self.shas[name], 1, key, *args))
+        except NoScriptError:
+            await client.script_load(self.scripts[name])
+            return int(await client.evalsha(self.shas[name], 1, key, *args))
+
+    async def apply_items(
+        self,
+        client: redis.Redis,
+        user_id: int,
+        lines: List[Tuple[int, int, int]],
+        mode: str = "add"
+    ) -> List[Optional[int]]:
+        key = self.key(user_id)
+        for attempt in range(2):
+            pipe = client.pipeline(transaction=True)
+            for product_id, quantity, cap in lines:
+                pipe.evalsha(self.shas[mode], 1, key, product_id, quantity, cap, self.ttl_seconds)
+            try:
+                results = await pipe.execute()
+                break
+            except NoScriptError:
+                if attempt:
+                    raise
+                await self.load_scripts(client)
+        return [None if int(result) < 0 else int(result) for result in results]
+
+    async def get_items(self, client: redis.Redis, user_id: int) -> Dict[str, str]:
+        return await client.hgetall(self.key(user_id))
+
+    async def add_item(self, client: redis.Redis, user_id: int, product_id: int, quantity: int, cap: int) -> Optional[int]:
+        new_quantity = await self._call(client, "add", self.key(user_id), product_id, quantity, cap, self.ttl_seconds)
+        return None if new_quantity < 0 else new_quantity
+
+    async def set_item(self, client: redis.Redis, user_id: int, product_id: int, quantity: int, cap: int) -> Optional[int]:
+        new_quantity = await self._call(client, "set", self.key(user_id), product_id, quantity, cap, self.ttl_seconds)
+        return None if new_quantity < 0 else new_quantity
+
+    async def remove_item(self, client: redis.Redis, user_id: int, product_id: int) -> bool:
+        return await self._call(client, "remove", self.key(user_id), product_id, self.ttl_seconds) > 0
+
+    async def clear(self, client: redis.Redis, user_id: int):
+        await client.delete(self.key(user_id))
+
+
+cart_store = CartStore()
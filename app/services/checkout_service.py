@@ -0,0 +1,95 @@
+from decimal import Decimal
+from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, case
+from sqlalchemy.orm import joinedload
+
+from app.db.models.order import Order, OrderItem
+from app.db.models.product import Product
+from app.core.utils import raise_bad_request
+
+
+class CheckoutService:
+    @staticmethod
+    def parse_cart(cart_data: Dict[str, str]) -> Dict[int, int]:
+        return {int(product_id): int(quantity) for product_id, quantity in cart_data.items()}
+
+    @staticmethod
+    async def reserve_stock(db: AsyncSession, quantities: Dict[int, int]) -> Dict[int, Decimal]:
+        product_ids = sorted(quantities)
+
+        # Lock rows in primary key order so overlapping checkouts cannot deadlock; the multi-row
+        # UPDATE below takes its row locks in no particular order. Inventory holds do not change
+        # this, since they only keep other carts from claiming the same stock.
+        await db.execute(
+            select(Product.id)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+
+        requested = case(quantities, value=Product.id)
+        result = await db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids), Product.stock >= requested)
+            .values(stock=Product.stock - requested)
+            .returning(Product.id, Product.price)
+            .execution_options(synchronize_session=False)
+        )
+        prices = {row.id: row.price for row in result.all()}
+
+        if len(prices) != len(quantities):
+            await db.rollback()
+            await CheckoutService._raise_unavailable(db, [pid for pid in product_ids if pid not in prices])
+
+        return prices
+
+    @staticmethod
+    async def _raise_unavailable(db: AsyncSession, product_ids: list):
+        result = await db.execute(
+            select(Product.id, Product.name).where(Product.id.in_(product_ids)).order_by(Product.id)
+        )
+        names = dict(result.all())
+
+        for product_id in product_ids:
+            if product_id not in names:
+                raise_bad_request(f"Product {product_id} not found")
+        raise_bad_request(f"Insufficient stock for product {names[product_ids[0]]}")
+
+    @staticmethod
+    async def checkout(db: AsyncSession, user_id: int, cart_data: Dict[str, str]) -> Order:
+        quantities = CheckoutService.parse_cart(cart_data)
+        prices = await CheckoutService.reserve_stock(db, quantities)
+
+        total_amount = sum(
+            (prices[product_id] * quantity for product_id, quantity in quantities.items()),
+            Decimal("0")
+        )
+
+        result = await db.execute(
+            insert(Order)
+            .values(user_id=user_id, total_amount=total_amount, status="pending")
+            .returning(Order.id)
+        )
+        order_id = result.scalar_one()
+
+        await db.execute(
+            insert(OrderItem),
+            [
+                {
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "unit_price": prices[product_id]
+                }
+                for product_id, quantity in quantities.items()
+            ]
+        )
+        await db.commit()
+
+        result = await db.execute(
+            select(Order)
+            .options(joinedload(Order.items))
+            .where(Order.id == order_id)
+        )
+        return result.unique().scalar_one()
@@ -1,21 +1,132 @@
-from typing import List
+import threading
+import time
+from email.message import EmailMessage
+from functools import lru_cache
+from string import Template
+from typing import List, Optional, Tuple
 
+from app.core.config import settings
+from app.services.email_transport import EmailTransport, EmailTransportError, create_email_transport
 
-class EmailService:
-    @staticmethod
-    async def send_email(to: List[str], subject: str, body: str):
-        print(f"[EMAIL] To: {to}, Subject: {subject}")
-        print(f"[EMAIL] Body: {body}")
-
-    @staticmethod
-    async def send_order_confirmation(to: str, order_id: int, total_amount: float):
-        subject = f"Order Confirmation - Order #{order_id}"
-        body = f"""
+EMAIL_TEMPLATES = {
+    "order_confirmation": (
+        "Order Confirmation - Order #$order_id",
+        """
         Thank you for your order!
 
-        Order ID: {order_id}
-        Total Amount: ${total_amount}
+        Order ID: $order_id
+        Total Amount: $$$total_amount
 
         We will process your order shortly.
         """
-        await EmailService.send_email([to], subject, body)
+    ),
+    "payment_reminder": (
+        "Payment Reminder - Order #$order_id",
+        """
+        Your order is waiting for payment.
+
+        Order ID: $order_id
+        Total Amount: $$$total_amount
+
+        Complete your payment to have your order processed.
+        """
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def compile_template(name: str) -> Tuple[Template, Template]:
+    subject, body = EMAIL_TEMPLATES[name]
+    return Template(subject), Template(body)
+
+
+def render_template(name: str, **context) -> Tuple[str, str]:
+    subject, body = compile_template(name)
+    return subject.substitute(context), body.substitute(context)
+
+
+class RateLimiter:
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1):
+        if self.rate_per_second <= 0:
+            return
+        tokens = min(tokens, self.burst)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate_per_second
+            time.sleep(wait)
+
+
+class EmailDispatcher:
+    def __init__(
+        self,
+        transport: Optional[EmailTransport] = None,
+        rate_per_second: float = settings.EMAIL_RATE_PER_SECOND
+    ):
+        self._transport = transport
+        self.limiter = RateLimiter(rate_per_second, max(rate_per_second, 1))
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    @property
+    def transport(self) -> EmailTransport:
+        if self._transport is None:
+            self._transport = create_email_transport()
+        return self._transport
+
+    def _record(self, attempted: int, sent: int):
+        with self._lock:
+            self.batches += 1
+            self.sent += sent
+            self.failed += attempted - sent
+
+    def send_now(self, messages: List[EmailMessage]) -> int:
+        # Transport failures propagate so the calling task can retry them itself.
+        self.limiter.acquire(len(messages))
+        try:
+            sent = self.transport.send_batch(messages)
+        except EmailTransportError as exc:
+            self._record(len(messages), exc.sent)
+            raise
+        self._record(len(messages), sent)
+        return sent
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "failed": self.failed, "batches": self.batches}
+
+
+email_dispatcher = EmailDispatcher()
+
+
+class EmailService:
+    @staticmethod
+    def build_message(to: List[str], subject: str, body: str) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = settings.EMAIL_FROM
+        message["To"] = ", ".join(to)
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    @staticmethod
+    def deliver(to: List[str], subject: str, body: str) -> int:
+        return email_dispatcher.send_now([EmailService.build_message(to, subject, body)])
+
@@ -0,0 +1,173 @@
+import abc
+import itertools
+import logging
+import os
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+from typing import List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmailTransportError(Exception):
+    def __init__(self, message: str, sent: int = 0):
+        super().__init__(message)
+        self.sent = sent
+
+
+class EmailTransport(abc.ABC):
+    @abc.abstractmethod
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        ...
+
+    def close(self):
+        pass
+
+
+class ConsoleTransport(EmailTransport):
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        for message in messages:
+            print(f"[EMAIL] To: {message['To']}, Subject: {message['Subject']}")
+            print(f"[EMAIL] Body: {message.get_content()}")
+        return len(messages)
+
+
+class MemoryTransport(EmailTransport):
+    def __init__(self):
+        self.outbox: List[EmailMessage] = []
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        with self._lock:
+            self.outbox.extend(messages)
+            self.batches += 1
+        return len(messages)
+
+    def clear(self):
+        with self._lock:
+            self.outbox.clear()
+            self.batches = 0
+
+
+class FileTransport(EmailTransport):
+    def __init__(self, directory: str = settings.EMAIL_FILE_DIR):
+        self.directory = directory
+        self._counter = itertools.count()
+
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        for message in messages:
+            path = os.path.join(self.directory, f"{time.time_ns()}-{next(self._counter)}.eml")
+            with open(path, "wb") as f:
+                f.write(message.as_bytes())
+        return len(messages)
+
+
+class SMTPTransport(EmailTransport):
+    def __init__(
+        self,
+        host: str = settings.SMTP_HOST,
+        port: int = settings.SMTP_PORT,
+        username: Optional[str] = settings.SMTP_USERNAME,
+        password: Optional[str] = settings.SMTP_PASSWORD,
+        use_tls: bool = settings.SMTP_USE_TLS,
+        timeout: float = settings.SMTP_TIMEOUT_SECONDS,
+        pool_size: int = settings.SMTP_POOL_SIZE
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.connections_opened = 0
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls(context=ssl.create_default_context())
+        if self.username:
+            connection.login(self.username, self.password or "")
+        self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    def _discard(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, connection: Optional[smtplib.SMTP]):
+        if connection is not None:
+            self._idle.put(connection)
+        self._slots.release()
+
+    def send_batch(self, messages: List[EmailMessage]) -> int:
+        try:
+            connection = self._checkout()
+        except (smtplib.SMTPException, OSError) as exc:
+            raise EmailTransportError(f"SMTP connection failed: {exc}") from exc
+
+        sent = 0
+        try:
+            for message in messages:
+                try:
+                    connection.send_message(message)
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    # Idle pooled connections get dropped by the server; reconnect once and resend.
+                    self._discard(connection)
+                    connection = None
+                    connection = self._connect()
+                    connection.send_message(message)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                    logger.warning("SMTP rejected message to %s: %s", message["To"], exc)
+                    continue
+                sent += 1
+        except (smtplib.SMTPException, OSError) as exc:
+            if connection is not None:
+                self._discard(connection)
+                connection = None
+            raise EmailTransportError(f"SMTP delivery failed: {exc}", sent=sent) from exc
+        finally:
+            self._checkin(connection)
+        return sent
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def create_email_transport(name: str = settings.EMAIL_TRANSPORT) -> EmailTransport:
+    if name == "smtp":
+        return SMTPTransport()
+    if name == "file":
+        return FileTransport()
+    if name == "memory":
+        return MemoryTransport()
+    return ConsoleTransport()
@@ -0,0 +1,324 @@
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.product import Product
+from app.services.cart_store import cart_store
+
+# Expired hold hashes outlive their expiry score so the sweeper can still read what to give back.
+HOLD_GRACE_SECONDS = 3600
+UNKNOWN_STOCK = -2
+INVALID_QUANTITY = -3
+
+# Per-SKU keys are built from ARGV[1] (the key prefix): <prefix>:stock:<id> is what is still
+# available to hold, <prefix>:held:<id> is the total currently held across all carts and
+# <prefix>:version:<id> is bumped whenever the counter is moved to follow products.stock.
+
+# KEYS cart hash, hold hash, expiry zset, sku set.
+# ARGV prefix, product id, quantity, mode, stock ('' if unknown), cart ttl, hold expiry, hold ttl, user id.
+# Returns the new cart quantity, -1 if stock is short, -2 if the SKU has no counter and no stock was given,
+# or -3 if the quantity is not positive (a negative delta would hand stock back to every shopper).
+RESERVE_SCRIPT = """
+local requested = tonumber(ARGV[3])
+if requested == nil or requested <= 0 then
+    return -3
+end
+local stock_key = ARGV[1] .. ':stock:' .. ARGV[2]
+local held_key = ARGV[1] .. ':held:' .. ARGV[2]
+if redis.call('EXISTS', stock_key) == 0 then
+    if ARGV[5] == '' then
+        return -2
+    end
+    redis.call('SET', stock_key, tonumber(ARGV[5]) - tonumber(redis.call('GET', held_key) or '0'))
+    redis.call('SADD', KEYS[4], ARGV[2])
+end
+local quantity = requested
+if ARGV[4] == 'add' then
+    quantity = quantity + tonumber(redis.call('HGET', KEYS[1], ARGV[2]) or '0')
+end
+if quantity < 0 then
+    return -3
+end
+local delta = quantity - tonumber(redis.call('HGET', KEYS[2], ARGV[2]) or '0')
+if delta > 0 and tonumber(redis.call('GET', stock_key)) < delta then
+    return -1
+end
+redis.call('DECRBY', stock_key, delta)
+redis.call('INCRBY', held_key, delta)
+redis.call('HSET', KEYS[1], ARGV[2], quantity)
+redis.call('HSET', KEYS[2], ARGV[2], quantity)
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+redis.call('EXPIRE', KEYS[2], ARGV[8])
+redis.call('ZADD', KEYS[3], ARGV[7], ARGV[9])
+return quantity
+"""
+
+# KEYS cart hash, hold hash, expiry zset. ARGV prefix, product id, cart ttl, user id.
+# Returns the number of cart fields removed.
+RELEASE_SCRIPT = """
+local held = tonumber(redis.call('HGET', KEYS[2], ARGV[2]) or '0')
+if held > 0 then
+    local stock_key = ARGV[1] .. ':stock:' .. ARGV[2]
+    if redis.call('EXISTS', stock_key) == 1 then
+        redis.call('INCRBY', stock_key, held)
+    end
+    redis.call('DECRBY', ARGV[1] .. ':held:' .. ARGV[2], held)
+    redis.call('HDEL', KEYS[2], ARGV[2])
+end
+local removed = redis.call('HDEL', KEYS[1], ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    redis.call('ZREM', KEYS[3], ARGV[4])
+end
+return removed
+"""
+
+# KEYS cart hash, hold hash, expiry zset. ARGV prefix, user id, expired-before timestamp ('' to release now).
+# When a timestamp is given the holds are only released if they were not refreshed since.
+# Returns the number of SKUs released, or -1 if the holds were refreshed.
+RELEASE_ALL_SCRIPT = """
+if ARGV[3] ~= '' then
+    local score = redis.call('ZSCORE', KEYS[3], ARGV[2])
+    if score and tonumber(score) > tonumber(ARGV[3]) then
+        return -1
+    end
+end
+local holds = redis.call('HGETALL', KEYS[2])
+for i = 1, #holds, 2 do
+    local stock_key = ARGV[1] .. ':stock:' .. holds[i]
+    if redis.call('EXISTS', stock_key) == 1 then
+        redis.call('INCRBY', stock_key, holds[i + 1])
+    end
+    redis.call('DECRBY', ARGV[1] .. ':held:' .. holds[i], holds[i + 1])
+end
+redis.call('DEL', KEYS[2])
+redis.call('ZREM', KEYS[3], ARGV[2])
+if ARGV[3] == '' then
+    redis.call('DEL', KEYS[1])
+end
+return #holds / 2
+"""
+
+# KEYS cart hash, hold hash, expiry zset. ARGV prefix, user id, then product id / ordered quantity pairs.
+# Products.stock has already dropped by the ordered quantity, so each counter moves by held - ordered.
+# Anything still held afterwards was not ordered and goes back to stock.
+CONSUME_SCRIPT = """
+for i = 3, #ARGV, 2 do
+    local held = tonumber(redis.call('HGET', KEYS[2], ARGV[i]) or '0')
+    local stock_key = ARGV[1] .. ':stock:' .. ARGV[i]
+    if redis.call('EXISTS', stock_key) == 1 then
+        redis.call('INCRBY', stock_key, held - tonumber(ARGV[i + 1]))
+    end
+    redis.call('INCR', ARGV[1] .. ':version:' .. ARGV[i])
+    if held > 0 then
+        redis.call('DECRBY', ARGV[1] .. ':held:' .. ARGV[i], held)
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    end
+end
+local holds = redis.call('HGETALL', KEYS[2])
+for i = 1, #holds, 2 do
+    local stock_key = ARGV[1] .. ':stock:' .. holds[i]
+    if redis.call('EXISTS', stock_key) == 1 then
+        redis.call('INCRBY', stock_key, holds[i + 1])
+    end
+    redis.call('DECRBY', ARGV[1] .. ':held:' .. holds[i], holds[i + 1])
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('ZREM', KEYS[3], ARGV[2])
+return 1
+"""
+
+# KEYS sku set. ARGV prefix, then product id / products.stock / expected version triples. Resets each
+# counter to stock minus holds, skipping SKUs whose version moved since it was read ('' to always apply):
+# a checkout that committed after that stock was read has already adjusted the counter.
+# Returns the number of counters reset.
+SYNC_SCRIPT = """
+local synced = 0
+for i = 2, #ARGV, 3 do
+    local version_key = ARGV[1] .. ':version:' .. ARGV[i]
+    if ARGV[i + 2] == '' or (redis.call('GET', version_key) or '0') == ARGV[i + 2] then
+        local held = tonumber(redis.call('GET', ARGV[1] .. ':held:' .. ARGV[i]) or '0')
+        redis.call('SET', ARGV[1] .. ':stock:' .. ARGV[i], tonumber(ARGV[i + 1]) - held)
+        redis.call('SADD', KEYS[1], ARGV[i])
+        redis.call('INCR', version_key)
+        synced = synced + 1
+    end
+end
+return synced
+"""
+
+
+class InventoryStore:
+    scripts = {
+        "reserve": RESERVE_SCRIPT,
+        "release": RELEASE_SCRIPT,
+        "release_all": RELEASE_ALL_SCRIPT,
+        "consume": CONSUME_SCRIPT,
+        "sync": SYNC_SCRIPT
+    }
+
+    def __init__(self, hold_ttl_seconds: int = settings.CART_TTL_SECONDS, prefix: str = "inventory"):
+        self.hold_ttl_seconds = hold_ttl_seconds
+        self.prefix = prefix
+        self.shas = {name: hashlib.sha1(script.encode()).hexdigest() for name, script in self.scripts.items()}
+
+    def stock_key(self, product_id: int) -> str:
+        return f"{self.prefix}:stock:{product_id}"
+
+    def held_key(self, product_id: int) -> str:
+        return f"{self.prefix}:held:{product_id}"
+
+    def version_key(self, product_id: int) -> str:
+        return f"{self.prefix}:version:{product_id}"
+
+    def hold_key(self, user_id: int) -> str:
+        return f"{self.prefix}:hold:user:{user_id}"
+
+    @property
+    def expiry_key(self) -> str:
+        return f"{self.prefix}:holds:expiry"
+
+    @property
+    def skus_key(self) -> str:
+        return f"{self.prefix}:skus"
+
+    def _user_keys(self, user_id: int) -> Tuple[str, str, str]:
+        return cart_store.key(user_id), self.hold_key(user_id), self.expiry_key
+
+    def _reserve_args(self, user_id: int, product_id: int, quantity: int, mode: str, stock: Optional[int]) -> tuple:
+        now = int(time.time())
+        return (
+            self.prefix, product_id, quantity, mode, "" if stock is None else stock,
+            cart_store.ttl_seconds, now + self.hold_ttl_seconds,
+            self.hold_ttl_seconds + HOLD_GRACE_SECONDS, user_id
+        )
+
+    async def load_scripts(self, client: redis.Redis):
+        for name, script in self.scripts.items():
+            self.shas[name] = await client.script_load(script)
+
+    async def _call(self, client: redis.Redis, name: str, keys: tuple, *args) -> int:
+        try:
+            return int(await client.evalsha(self.shas[name], len(keys), *keys, *args))
+        except NoScriptError:
+            await client.script_load(self.scripts[name])
+            return int(await client.evalsha(self.shas[name], len(keys), *keys, *args))
+
+    async def reserve(
+        self,
+        client: redis.Redis,
+        user_id: int,
+        product_id: int,
+        quantity: int,
+        mode: str,
+        load_stock: Callable[[], Awaitable[int]]
+    ) -> Optional[int]:
+        keys = (*self._user_keys(user_id), self.skus_key)
+        result = await self._call(client, "reserve", keys, *self._reserve_args(user_id, product_id, quantity, mode, None))
+        if result == UNKNOWN_STOCK:
+            stock = await load_stock()
+            result = await self._call(client, "reserve", keys, *self._reserve_args(user_id, product_id, quantity, mode, stock))
+        return None if result < 0 else result
+
+    async def reserve_items(
+        self,
+        client: redis.Redis,
+        user_id: int,
+        lines: List[Tuple[int, int, int]],
+        mode: str = "add"
+    ) -> List[Optional[int]]:
+        keys = (*self._user_keys(user_id), self.skus_key)
+        for attempt in range(2):
+            pipe = client.pipeline(transaction=True)
+            for product_id, quantity, stock in lines:
+                pipe.evalsha(self.shas["reserve"], len(keys), *keys, *self._reserve_args(user_id, product_id, quantity, mode, stock))
+            try:
+                results = await pipe.execute()
+                break
+            except NoScriptError:
+                if attempt:
+                    raise
+                await self.load_scripts(client)
+        return [None if int(result) < 0 else int(result) for result in results]
+
+    async def release(self, client: redis.Redis, user_id: int, product_id: int) -> bool:
+        removed = await self._call(
+            client, "release", self._user_keys(user_id), self.prefix, product_id, cart_store.ttl_seconds, user_id
+        )
+        return removed > 0
+
+    async def release_all(self, client: redis.Redis, user_id: int, expired_before: Optional[int] = None) -> int:
+        return await self._call(
+            client, "release_all", self._user_keys(user_id),
+            self.prefix, user_id, "" if expired_before is None else expired_before
+        )
+
+    async def get_holds(self, client: redis.Redis, user_id: int) -> Dict[int, int]:
+        holds = await client.hgetall(self.hold_key(user_id))
+        return {int(product_id): int(quantity) for product_id, quantity in holds.items()}
+
+    async def consume(self, client: redis.Redis, user_id: int, quantities: Dict[int, int]):
+        args = [value for product_id, quantity in quantities.items() for value in (product_id, quantity)]
+        await self._call(client, "consume", self._user_keys(user_id), self.prefix, user_id, *args)
+
+    async def versions(self, client: redis.Redis, product_ids: List[int]) -> Dict[int, str]:
+        values = await client.mget([self.version_key(product_id) for product_id in product_ids])
+        return {product_id: value or "0" for product_id, value in zip(product_ids, values)}
+
+    async def sync(self, client: redis.Redis, stocks: Dict[int, int], versions: Optional[Dict[int, str]] = None) -> int:
+        if not stocks:
+            return 0
+        versions = versions or {}
+        args = [
+            value
+            for product_id, stock in stocks.items()
+            for value in (product_id, stock, versions.get(product_id, ""))
+        ]
+        return await self._call(client, "sync", (self.skus_key,), self.prefix, *args)
+
+    async def reconcile(self, client: redis.Redis, db: AsyncSession, chunk_size: int = 500) -> int:
+        product_ids = await self.tracked_products(client)
+        synced = 0
+        for start in range(0, len(product_ids), chunk_size):
+            chunk = product_ids[start:start + chunk_size]
+            # Versions are read before the stock, so a checkout landing in between is not overwritten.
+            versions = await self.versions(client, chunk)
+            result = await db.execute(select(Product.id, Product.stock).where(Product.id.in_(chunk)))
+            stocks = dict(result.all())
+            synced += await self.sync(client, stocks, versions)
+            for product_id in set(chunk) - stocks.keys():
+                await self.forget(client, product_id)
+        return synced
+
+    async def forget(self, client: redis.Redis, product_id: int):
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(self.stock_key(product_id))
+            pipe.srem(self.skus_key, product_id)
+            await pipe.execute()
+
+    async def available(self, client: redis.Redis, product_id: int) -> Optional[int]:
+        value = await client.get(self.stock_key(product_id))
+        return None if value is None else int(value)
+
+    async def tracked_products(self, client: redis.Redis) -> List[int]:
+        return sorted(int(product_id) for product_id in await client.smembers(self.skus_key))
+
+    async def release_expired(self, client: redis.Redis, now: Optional[int] = None, limit: int = 500) -> int:
+        now = int(time.time()) if now is None else now
+        user_ids = await client.zrangebyscore(self.expiry_key, "-inf", now, start=0, num=limit)
+        released = 0
+        for user_id in user_ids:
+            if await self.release_all(client, int(user_id), expired_before=now) >= 0:
+                released += 1
+        return released
+
+
+inventory_store = InventoryStore()
+
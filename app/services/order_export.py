@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.db.models.order import Order, OrderItem
+
+ORDER_FIELDS = ("id", "user_id", "status", "total_amount", "payment_intent_id", "created_at")
+ITEM_FIELDS = ("item_id", "product_id", "quantity", "unit_price")
+CSV_HEADER = ("order_id", "user_id", "status", "total_amount", "payment_intent_id", "created_at", *ITEM_FIELDS)
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class OrderExportService:
+    @staticmethod
+    def build_query(
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        statuses: Optional[List[str]] = None
+    ) -> Select:
+        query = (
+            select(
+                Order.id, Order.user_id, Order.status, Order.total_amount, Order.payment_intent_id, Order.created_at,
+                OrderItem.id.label("item_id"), OrderItem.product_id, OrderItem.quantity, OrderItem.unit_price
+            )
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .order_by(Order.created_at, Order.id, OrderItem.id)
+        )
+        if created_from is not None:
+            query = query.where(Order.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Order.created_at < created_to)
+        if statuses:
+            query = query.where(Order.status.in_(statuses))
+        return query
+
+    @staticmethod
+    async def stream_rows(
+        session_factory: async_sessionmaker,
+        query: Select,
+        batch_size: int = settings.ORDER_EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[list]:
+        # stream() keeps a server-side cursor open, so only one batch is in memory at a time.
+        async with session_factory() as db:
+            result = await db.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                yield partition
+
+    @staticmethod
+    async def to_ndjson(session_factory: async_sessionmaker, query: Select) -> AsyncIterator[str]:
+        # Rows arrive ordered by order, so an order's items are contiguous and can be folded as they stream.
+        current = None
+        async for partition in OrderExportService.stream_rows(session_factory, query):
+            lines = []
+            for row in partition:
+                if current is None or current["id"] != row.id:
+                    if current is not None:
+                        lines.append(json.dumps(current))
+                    current = {field: _plain(getattr(row, field)) for field in ORDER_FIELDS}
+                    current["items"] = []
+                if row.item_id is not None:
+                    current["items"].append({
+                        "id": row.item_id,
+                        "product_id": row.product_id,
+                        "quantity": row.quantity,
+                        "unit_price": _plain(row.unit_price)
+                    })
+            if lines:
+                yield "\n".join(lines) + "\n"
+        if current is not None:
+            yield json.dumps(current) + "\n"
+
+    @staticmethod
+    async def to_csv(session_factory: async_sessionmaker, query: Select) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        yield buffer.getvalue()
+
+        async for partition in OrderExportService.stream_rows(session_factory, query):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_plain(value) for value in row] for row in partition)
+            yield buffer.getvalue()
@@ -1,20 +1,35 @@
 import stripe
+from datetime import datetime
+from typing import Optional
 from app.core.config import settings
+from app.services.stripe_gateway import stripe_gateway, PaymentGatewayError
 
 stripe.api_key = settings.STRIPE_API_KEY
 
 
 class PaymentService:
     @staticmethod
-    async def create_payment_intent(amount: float, currency: str = "usd", metadata: dict = None):
+    def idempotency_key(order_id: int, created_at: datetime, prefix: str = settings.STRIPE_IDEMPOTENCY_PREFIX) -> str:
+        # Order ids repeat across environments and after a database reset; the deployment prefix and
+        # creation time keep one order's key from returning another order's intent from Stripe's cache.
+        return f"{prefix}-order-{order_id}-{created_at.strftime('%Y%m%dT%H%M%S%f')}-payment-intent"
+
+    @staticmethod
+    async def create_payment_intent(
+        amount: float,
+        currency: str = "usd",
+        metadata: dict = None,
+        idempotency_key: Optional[str] = None
+    ):
         try:
-            intent = stripe.PaymentIntent.create(
-                amount=int(amount * 100),
+            intent = await stripe_gateway.create_payment_intent(
+                amount=int(round(amount * 100)),
                 currency=currency,
-                metadata=metadata or {}
+                metadata=metadata or {},
+                idempotency_key=idempotency_key
             )
             return intent
-        except stripe.error.StripeError as e:
+        except PaymentGatewayError as e:
             raise Exception(f"Stripe error: {str(e)}")
 
     @staticmethod
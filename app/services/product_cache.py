@@ -0,0 +1,182 @@
+import hashlib
+import json
+from typing import Any, List, Optional, Tuple
+import redis.asyncio as redis
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.redis_pool import get_redis_client
+
+PRODUCT_LIST_VERSION_KEY = "catalog:products:version"
+
+# KEYS value key, version key. ARGV value, version read before the value was loaded ('' if unset), ttl.
+# Only fills if no invalidation bumped the version in between.
+FILL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[2] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+
+class ProductCache:
+    def __init__(
+        self,
+        ttl_seconds: int = settings.PRODUCT_CACHE_TTL_SECONDS,
+        local_ttl_seconds: int = settings.PRODUCT_CACHE_LOCAL_TTL_SECONDS,
+        max_entries: int = settings.PRODUCT_CACHE_MAX_ENTRIES,
+        enabled: bool = settings.PRODUCT_CACHE_ENABLED
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.local = LRUCache(max_entries=max_entries, ttl_seconds=min(local_ttl_seconds, ttl_seconds))
+        self._redis: Optional[redis.Redis] = None
+        self._generation = 0
+
+    @property
+    def redis(self) -> redis.Redis:
+        return self._redis or get_redis_client()
+
+    @staticmethod
+    def product_key(product_id: int) -> str:
+        return f"catalog:product:{product_id}"
+
+    @staticmethod
+    def product_list_key(params: dict) -> str:
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"catalog:products:list:{digest}"
+
+    @staticmethod
+    def categories_key() -> str:
+        return "catalog:categories:list"
+
+    @staticmethod
+    def version_key(key: str) -> str:
+        return f"{key}:version"
+
+    async def _redis_get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.redis.get(key)
+        except redis.RedisError:
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def _redis_set(self, key: str, value: Any):
+        try:
+            await self.redis.set(key, json.dumps(value), ex=self.ttl_seconds)
+        except redis.RedisError:
+            pass
+
+    async def _invalidate(self, keys: List[str], client: Optional["redis.Redis"] = None, bump_lists: bool = False):
+        try:
+            async with (client or self.redis).pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*keys)
+                for key in keys:
+                    pipe.incr(self.version_key(key))
+                    pipe.expire(self.version_key(key), self.ttl_seconds)
+                if bump_lists:
+                    pipe.incr(PRODUCT_LIST_VERSION_KEY)
+                await pipe.execute()
+        except redis.RedisError:
+            pass
+
+    async def _list_version(self) -> str:
+        try:
+            return await self.redis.get(PRODUCT_LIST_VERSION_KEY) or "0"
+        except redis.RedisError:
+            return "0"
+
+    async def _versioned_list_key(self, key: str) -> str:
+        version = await self._list_version()
+        return key.replace("catalog:products:list:", f"catalog:products:list:v{version}:", 1)
+
+    async def get(self, key: str) -> Tuple[Optional[Any], Optional[tuple]]:
+        # On a miss, also returns the key's version as of before the caller loads the value;
+        # set() only fills if no invalidation has bumped it since.
+        if not self.enabled:
+            return None, None
+
+        value = self.local.get(key)
+        if value is not None:
+            return value, None
+
+        try:
+            raw, version = await self.redis.mget(key, self.version_key(key))
+        except redis.RedisError:
+            return None, (None, self._generation)
+        if raw is not None:
+            value = json.loads(raw)
+            self.local.set(key, value)
+            return value, None
+        return None, (version or "", self._generation)
+
+    async def set(self, key: str, value: Any, fill: Optional[tuple]):
+        if fill is None:
+            return
+
+        version, generation = fill
+        if generation == self._generation:
+            self.local.set(key, value)
+        if version is None:
+            return
+        try:
+            fill_script = self.redis.register_script(FILL_SCRIPT)
+            await fill_script(keys=[key, self.version_key(key)], args=[json.dumps(value), version, self.ttl_seconds])
+        except redis.RedisError:
+            pass
+
+    async def get_list(self, key: str) -> Tuple[Optional[Any], Optional[tuple]]:
+        # On a miss, also returns the version the read was made at; set_list() fills under that
+        # version, so rows queried before an invalidation never land in the newer one.
+        if not self.enabled:
+            return None, None
+
+        value = self.local.get(key)
+        if value is not None:
+            return value, None
+
+        fill = (await self._versioned_list_key(key), self._generation)
+        value = await self._redis_get(fill[0])
+        if value is not None:
+            self.local.set(key, value)
+        return value, fill
+
+    async def set_list(self, key: str, value: Any, fill: Optional[tuple]):
+        if fill is None:
+            return
+
+        redis_key, generation = fill
+        if generation == self._generation:
+            self.local.set(key, value)
+        await self._redis_set(redis_key, value)
+
+    async def invalidate_product(self, product_id: int):
+        await self.invalidate_products([product_id])
+
+    async def invalidate_products(self, product_ids: List[int], client: Optional["redis.Redis"] = None):
+        keys = [self.product_key(product_id) for product_id in product_ids]
+        for key in keys:
+            self.local.delete(key)
+        self._generation += 1
+        self.local.delete_prefix("catalog:products:list:")
+        await self._invalidate(keys, client, bump_lists=True)
+
+    async def invalidate_categories(self):
+        key = self.categories_key()
+        self.local.delete(key)
+        self._generation += 1
+        await self._invalidate([key])
+
+    async def clear(self):
+        self.local.clear()
+        try:
+            keys = [key async for key in self.redis.scan_iter(match="catalog:*")]
+            if keys:
+                await self.redis.delete(*keys)
+        except redis.RedisError:
+            pass
+
+
+product_cache = ProductCache()
@@ -0,0 +1,291 @@
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional
+import redis.asyncio as redis
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils import raise_not_implemented
+from app.db.models.product import Product, Category
+from app.schemas.product import ProductCreate
+from app.services.inventory_service import inventory_store
+from app.services.product_cache import product_cache
+from app.services.search_service import search_backend
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+IMPORT_COLUMNS = ("sku", "name", "description", "price", "stock", "category_id", "image_url")
+UPDATE_COLUMNS = IMPORT_COLUMNS[1:]
+MAX_LINE_LENGTH = 1024 * 1024
+STAGING_TABLE = "product_import_staging"
+UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    sku text NOT NULL,
+    name text NOT NULL,
+    description text,
+    price numeric(10, 2) NOT NULL,
+    stock integer NOT NULL,
+    category_id integer,
+    image_url text
+) ON COMMIT DELETE ROWS
+"""
+
+UPSERT_FROM_STAGING_SQL = f"""
+INSERT INTO products ({", ".join(IMPORT_COLUMNS)})
+SELECT {", ".join(IMPORT_COLUMNS)} FROM {STAGING_TABLE}
+ON CONFLICT (sku) DO UPDATE SET
+    {", ".join(f"{column} = EXCLUDED.{column}" for column in UPDATE_COLUMNS)},
+    updated_at = now()
+RETURNING id, sku, (xmax = 0) AS inserted
+"""
+
+
+class ImportAborted(Exception):
+    pass
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    if not content_type:
+        return None
+    return IMPORT_FORMATS.get(content_type.split(";")[0].strip().lower())
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(buffer) > MAX_LINE_LENGTH:
+            raise ImportAborted(f"Import line longer than {MAX_LINE_LENGTH} bytes")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    # Only a quote that opens a field starts a quoted section; one inside an unquoted
+    # field (5" tv) is literal, as csv.reader treats it.
+    position = 0
+    while True:
+        quote = line.find('"', position)
+        if quote < 0:
+            return in_quotes
+        if in_quotes:
+            if line.startswith('""', quote):
+                position = quote + 2
+                continue
+            in_quotes = False
+        elif quote == 0 or line[quote - 1] == ",":
+            in_quotes = True
+        position = quote + 1
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Optional[dict]]:
+    header = None
+    pending: List[str] = []
+    pending_length = 0
+    async for line in lines:
+        in_quotes = ends_in_quotes(line, bool(pending))
+        pending.append(line)
+        pending_length += len(line) + 1
+        if in_quotes:
+            # A quoted field may contain newlines; keep reading until it closes, within the record limit.
+            if pending_length > MAX_LINE_LENGTH:
+                pending, pending_length = [], 0
+                yield None
+            continue
+        record = "\n".join(pending)
+        pending, pending_length = [], 0
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        if len(values) != len(header):
+            yield None
+            continue
+        yield {column: value if value != "" else None for column, value in zip(header, values)}
+
+    if pending:
+        yield None
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Optional[dict]]:
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield row if isinstance(row, dict) else None
+
+
+class ProductImporter:
+    def __init__(
+        self,
+        db: AsyncSession,
+        import_format: str,
+        redis_client: Optional[redis.Redis] = None,
+        chunk_size: int = settings.PRODUCT_IMPORT_CHUNK_SIZE,
+        max_errors: int = settings.PRODUCT_IMPORT_MAX_ERRORS
+    ):
+        self.db = db
+        self.import_format = import_format
+        self.redis_client = redis_client
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.superseded = 0
+        self.aborted = False
+        self.errors: List[dict] = []
+        self._category_ids: set = set()
+
+    def _record_error(self, row: int, sku: Optional[str], messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "sku": sku, "errors": messages})
+
+    def _validate(self, row_number: int, row: Optional[dict]) -> Optional[dict]:
+        if row is None:
+            self._record_error(row_number, None, ["Malformed row"])
+            return None
+        try:
+            # Blank cells and nulls fall back to the schema defaults (e.g. stock 0) rather than failing.
+            product = ProductCreate.model_validate({key: value for key, value in row.items() if value is not None})
+        except ValidationError as e:
+            messages = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            self._record_error(row_number, row.get("sku"), messages)
+            return None
+        if product.category_id is not None and product.category_id not in self._category_ids:
+            self._record_error(row_number, product.sku, [f"category_id: Category {product.category_id} not found"])
+            return None
+        return product.model_dump(include=set(IMPORT_COLUMNS))
+
+    async def _upsert_copy(self, rows: List[dict]) -> list:
+        await self.db.execute(text(CREATE_STAGING_SQL))
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+            columns=IMPORT_COLUMNS
+        )
+        result = await self.db.execute(text(UPSERT_FROM_STAGING_SQL))
+        return [(row.id, row.sku, row.inserted) for row in result.all()]
+
+    async def _upsert_insert(self, rows: List[dict]) -> list:
+        result = await self.db.execute(select(Product.sku).where(Product.sku.in_([row["sku"] for row in rows])))
+        existing = set(result.scalars().all())
+
+        statement = UPSERT_INSERTS[self.db.get_bind().dialect.name](Product).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Product.sku],
+            set_={**{column: statement.excluded[column] for column in UPDATE_COLUMNS}, "updated_at": func.now()}
+        ).returning(Product.id, Product.sku)
+        result = await self.db.execute(statement)
+        return [(row.id, row.sku, row.sku not in existing) for row in result.all()]
+
+    async def _flush(self, chunk: Dict[str, tuple]):
+        if not chunk:
+            return
+        rows = [row for _, row in chunk.values()]
+        dialect = self.db.get_bind().dialect
+        try:
+            if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+                results = await self._upsert_copy(rows)
+            else:
+                results = await self._upsert_insert(rows)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            for row_number, row in chunk.values():
+                self._record_error(row_number, row["sku"], [f"database: {str(getattr(e, 'orig', e))[:200]}"])
+            return
+
+        inserted = sum(1 for _, _, was_inserted in results if was_inserted)
+        self.inserted += inserted
+        self.updated += len(results) - inserted
+        await product_cache.invalidate_products([product_id for product_id, _, _ in results])
+        if self.redis_client is not None:
+            # Keep the reservation counters in step with the stock just written, as update_product does.
+            try:
+                stocks = {product_id: chunk[sku][1]["stock"] for product_id, sku, _ in results}
+                await inventory_store.sync(self.redis_client, stocks)
+            except RedisError:
+                pass
+
+    async def run(self, body: AsyncIterator[bytes]) -> dict:
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise_not_implemented(f"Product import does not support the {dialect} dialect")
+
+        start = time.perf_counter()
+        result = await self.db.execute(select(Category.id))
+        self._category_ids = set(result.scalars().all())
+
+        lines = iter_lines(body)
+        rows = iter_csv_rows(lines) if self.import_format == "csv" else iter_ndjson_rows(lines)
+
+        # Keyed by SKU: a repeated SKU within one chunk keeps its last row, as ON CONFLICT
+        # cannot touch the same row twice in a single statement.
+        chunk: Dict[str, tuple] = {}
+        try:
+            async for row in rows:
+                self.rows += 1
+                product = self._validate(self.rows, row)
+                if product is None:
+                    continue
+                if product["sku"] in chunk:
+                    self.superseded += 1
+                chunk[product["sku"]] = (self.rows, product)
+                if len(chunk) >= self.chunk_size:
+                    await self._flush(chunk)
+                    chunk = {}
+        except ImportAborted as e:
+            # Earlier chunks are already committed, so stop here and report what was written.
+            self.rows += 1
+            self.aborted = True
+            self._record_error(self.rows, None, [str(e)])
+        await self._flush(chunk)
+
+        if self.inserted or self.updated:
+            search_backend.reset()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "format": self.import_format,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "superseded": self.superseded,
+            "aborted": self.aborted,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else 0.0
+        }
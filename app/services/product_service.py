@@ -0,0 +1,16 @@
+from typing import Dict, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.db.models.product import Product
+
+
+class ProductService:
+    @staticmethod
+    async def get_products_by_ids(db: AsyncSession, product_ids: Iterable[int]) -> Dict[int, Product]:
+        ids = {int(product_id) for product_id in product_ids}
+        if not ids:
+            return {}
+
+        result = await db.execute(select(Product).where(Product.id.in_(ids)))
+        return {product.id: product for product in result.scalars().all()}
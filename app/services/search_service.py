@@ -0,0 +1,132 @@
+import asyncio
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from sqlalchemy import Select, case, false, func, literal_column, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.product import Product
+
+TOKEN_PATTERN = re.compile(r"\w+")
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+
+class PostgresSearchBackend:
+    search_vector = literal_column("products.search_vector")
+    config = literal_column("'english'::regconfig")
+
+    async def apply(self, db: AsyncSession, query: Select, term: str) -> Select:
+        ts_query = func.websearch_to_tsquery(self.config, term)
+        rank = func.ts_rank_cd(self.search_vector, ts_query)
+        return query.where(self.search_vector.op("@@")(ts_query)).order_by(rank.desc(), Product.id)
+
+    def index_product(self, product: Product):
+        pass
+
+    def remove_product(self, product_id: int):
+        pass
+
+    def reset(self):
+        pass
+
+
+class InMemorySearchBackend:
+    """Inverted index over product name/description for databases without
+    full-text search (SQLite, tests). The index lives in this process and is
+    built from the products table on first use."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._documents: Dict[int, Set[str]] = {}
+        self._built = False
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def tokenize(text: Optional[str]) -> List[str]:
+        tokens = []
+        for token in TOKEN_PATTERN.findall((text or "").lower()):
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.append(token)
+        return tokens
+
+    def _add(self, product_id: int, name: Optional[str], description: Optional[str]):
+        self.remove_product(product_id)
+        scores: Dict[str, float] = defaultdict(float)
+        for token in self.tokenize(name):
+            scores[token] += NAME_WEIGHT
+        for token in self.tokenize(description):
+            scores[token] += DESCRIPTION_WEIGHT
+
+        for token, score in scores.items():
+            self._postings[token][product_id] = score
+        self._documents[product_id] = set(scores)
+
+    def index_product(self, product: Product):
+        if self._built:
+            self._add(product.id, product.name, product.description)
+
+    def remove_product(self, product_id: int):
+        for token in self._documents.pop(product_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def reset(self):
+        self._postings.clear()
+        self._documents.clear()
+        self._built = False
+
+    async def _ensure_index(self, db: AsyncSession):
+        if self._built:
+            return
+        async with self._lock:
+            if self._built:
+                return
+            result = await db.execute(select(Product.id, Product.name, Product.description))
+            for product_id, name, description in result.all():
+                self._add(product_id, name, description)
+            self._built = True
+
+    def search(self, term: str) -> List[int]:
+        terms = set(self.tokenize(term))
+        if not terms:
+            return []
+
+        postings = sorted((self._postings.get(token, {}) for token in terms), key=len)
+        scores = {product_id: score for product_id, score in postings[0].items()}
+        for posting in postings[1:]:
+            scores = {
+                product_id: score + posting[product_id]
+                for product_id, score in scores.items()
+                if product_id in posting
+            }
+
+        return sorted(scores, key=lambda product_id: (-scores[product_id], product_id))
+
+    async def apply(self, db: AsyncSession, query: Select, term: str) -> Select:
+        await self._ensure_index(db)
+        product_ids = self.search(term)
+        if not product_ids:
+            return query.where(false())
+
+        positions = {product_id: position for position, product_id in enumerate(product_ids)}
+        return query.where(Product.id.in_(product_ids)).order_by(case(positions, value=Product.id))
+
+
+def create_search_backend(database_url: str = settings.DATABASE_URL, backend: str = settings.SEARCH_BACKEND):
+    if backend == "auto":
+        backend = "postgres" if make_url(database_url).get_backend_name() == "postgresql" else "memory"
+    if backend == "postgres":
+        return PostgresSearchBackend()
+    if backend == "memory":
+        return InMemorySearchBackend()
+    raise ValueError(f"Unknown search backend: {backend}")
+
+
+search_backend = create_search_backend()
@@ -0,0 +1,114 @@
+import asyncio
+import random
+from typing import Optional
+import httpx
+import stripe
+
+from app.core.config import settings
+
+RETRYABLE_STATUS_CODES = {409, 429, 500, 502, 503, 504}
+
+
+class PaymentGatewayError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StripeGateway:
+    def __init__(
+        self,
+        api_key: str = settings.STRIPE_API_KEY,
+        api_base: str = settings.STRIPE_API_BASE,
+        timeout: float = settings.STRIPE_TIMEOUT_SECONDS,
+        max_retries: int = settings.STRIPE_MAX_RETRIES,
+        max_concurrency: int = settings.STRIPE_MAX_CONCURRENCY,
+        max_connections: int = settings.STRIPE_MAX_CONNECTIONS,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key
+        self.api_base = api_base
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_base,
+                auth=(self.api_key, ""),
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self.transport
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def _should_retry(response: httpx.Response) -> bool:
+        should_retry = response.headers.get("Stripe-Should-Retry")
+        if should_retry is not None:
+            return should_retry == "true"
+        return response.status_code in RETRYABLE_STATUS_CODES
+
+    async def _backoff(self, attempt: int):
+        await asyncio.sleep(min(2.0, 0.25 * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+    async def request(self, method: str, path: str, data: dict, idempotency_key: Optional[str] = None) -> dict:
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self.client.request(method, path, data=data, headers=headers)
+                except httpx.TransportError as e:
+                    if attempt < self.max_retries:
+                        await self._backoff(attempt)
+                        continue
+                    raise PaymentGatewayError(f"Stripe request failed: {e}")
+
+                if response.status_code < 400:
+                    return response.json()
+                if attempt < self.max_retries and self._should_retry(response):
+                    await self._backoff(attempt)
+                    continue
+
+                try:
+                    message = response.json()["error"]["message"]
+                except (ValueError, KeyError, TypeError):
+                    message = response.text
+                raise PaymentGatewayError(message, status_code=response.status_code)
+
+    async def create_payment_intent(
+        self,
+        amount: int,
+        currency: str,
+        metadata: dict,
+        idempotency_key: Optional[str] = None
+    ) -> stripe.PaymentIntent:
+        data = {"amount": amount, "currency": currency}
+        data.update({f"metadata[{key}]": value for key, value in metadata.items()})
+
+        payload = await self.request("POST", "/v1/payment_intents", data, idempotency_key)
+        return stripe.PaymentIntent.construct_from(payload, self.api_key)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+stripe_gateway = StripeGateway()
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, update, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.models.order import Order
+from app.db.models.payment_event import StripeEvent
+
+logger = logging.getLogger(__name__)
+
+ORDER_STATUS_BY_EVENT = {
+    "payment_intent.succeeded": "paid",
+}
+
+
+class WebhookService:
+    @staticmethod
+    async def record_event(db: AsyncSession, event: dict, payload: str) -> bool:
+        db.add(StripeEvent(event_id=event["id"], type=event["type"], payload=payload, status="pending"))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return False
+        return True
+
+
+class WebhookMetrics:
+    def __init__(self):
+        self.batches = 0
+        self.processed = 0
+        self.failed = 0
+        self.total_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.last_lag_seconds = 0.0
+
+    def record(self, lags: list, failed: int):
+        self.batches += 1
+        self.processed += len(lags)
+        self.failed += failed
+        if lags:
+            self.total_lag_seconds += sum(lags)
+            self.max_lag_seconds = max(self.max_lag_seconds, max(lags))
+            self.last_lag_seconds = lags[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            "batches": self.batches,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_lag_ms": round(self.total_lag_seconds * 1000 / self.processed, 3) if self.processed else 0.0,
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 3),
+            "last_lag_ms": round(self.last_lag_seconds * 1000, 3)
+        }
+
+
+class WebhookProcessor:
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = settings.WEBHOOK_BATCH_SIZE,
+        poll_interval: float = settings.WEBHOOK_POLL_INTERVAL_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.metrics = WebhookMetrics()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _lag_seconds(received_at: Optional[datetime], now: datetime) -> float:
+        if received_at is None:
+            return 0.0
+        if received_at.tzinfo is None:
+            received_at = received_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (now - received_at).total_seconds())
+
+    async def process_batch(self) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(StripeEvent)
+                .where(StripeEvent.status == "pending")
+                .order_by(StripeEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            events = result.scalars().all()
+            if not events:
+                return 0
+
+            targets = defaultdict(lambda: (set(), set()))
+            failed_ids = []
+            for event in events:
+                status = ORDER_STATUS_BY_EVENT.get(event.type)
+                if status is None:
+                    continue
+                try:
+                    intent = json.loads(event.payload)["data"]["object"]
+                except (ValueError, KeyError, TypeError):
+                    failed_ids.append(event.id)
+                    continue
+
+                order_ids, intent_ids = targets[status]
+                order_id = (intent.get("metadata") or {}).get("order_id")
+                if order_id and str(order_id).isdigit():
+                    order_ids.add(int(order_id))
+                if intent.get("id"):
+                    intent_ids.add(intent["id"])
+
+            for status, (order_ids, intent_ids) in targets.items():
+                conditions = []
+                if order_ids:
+                    conditions.append(Order.id.in_(order_ids))
+                if intent_ids:
+                    conditions.append(Order.payment_intent_id.in_(intent_ids))
+                if conditions:
+                    await db.execute(
+                        update(Order)
+                        .where(or_(*conditions))
+                        .values(status=status)
+                        .execution_options(synchronize_session=False)
+                    )
+
+            processed_ids = [event.id for event in events if event.id not in failed_ids]
+            if processed_ids:
+                await db.execute(
+                    update(StripeEvent)
+                    .where(StripeEvent.id.in_(processed_ids))
+                    .values(status="processed", processed_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+            if failed_ids:
+                await db.execute(
+                    update(StripeEvent)
+                    .where(StripeEvent.id.in_(failed_ids))
+                    .values(status="failed", processed_at=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+
+            now = datetime.now(timezone.utc)
+            self.metrics.record(
+                [self._lag_seconds(event.received_at, now) for event in events if event.id not in failed_ids],
+                len(failed_ids)
+            )
+            return len(events)
+
+    async def drain(self) -> int:
+        total = 0
+        while True:
+            processed = await self.process_batch()
+            total += processed
+            if processed < self.batch_size:
+                return total
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self):
+        while True:
+            try:
+                await self.drain()
+            except Exception:
+                logger.exception("Stripe webhook batch failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+
+webhook_processor = WebhookProcessor()
@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import secrets
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_fake_stripe_app(latency: float = 0.0, failures: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake Stripe")
+    app.state.latency = latency
+    app.state.failures = failures
+    app.state.requests = 0
+    app.state.intents = {}
+    app.state.idempotent_responses = {}
+
+    @app.post("/v1/payment_intents")
+    async def create_payment_intent(request: Request):
+        app.state.requests += 1
+        if app.state.latency:
+            await asyncio.sleep(app.state.latency)
+
+        if app.state.failures > 0:
+            app.state.failures -= 1
+            return JSONResponse(
+                {"error": {"type": "api_error", "message": "Injected failure"}},
+                status_code=500,
+                headers={"Stripe-Should-Retry": "true"}
+            )
+
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if idempotency_key in app.state.idempotent_responses:
+            return app.state.idempotent_responses[idempotency_key]
+
+        form = await request.form()
+        if "amount" not in form or "currency" not in form:
+            return JSONResponse(
+                {"error": {"type": "invalid_request_error", "message": "Missing amount or currency"}},
+                status_code=400,
+                headers={"Stripe-Should-Retry": "false"}
+            )
+
+        intent_id = f"pi_{secrets.token_hex(12)}"
+        intent = {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(form["amount"]),
+            "currency": form["currency"],
+            "status": "requires_payment_method",
+            "client_secret": f"{intent_id}_secret_{secrets.token_hex(12)}",
+            "metadata": {
+                key[len("metadata["):-1]: value
+                for key, value in form.items()
+                if key.startswith("metadata[")
+            }
+        }
+        app.state.intents[intent_id] = intent
+        if idempotency_key:
+            app.state.idempotent_responses[idempotency_key] = intent
+        return intent
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local fake of the Stripe PaymentIntents API")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    uvicorn.run(create_fake_stripe_app(latency=args.latency), host="127.0.0.1", port=args.port)
@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import insert, update
+
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.models.product import Product, Category
+from app.db.models.order import Order, OrderItem
+
+
+async def place_order(db, user_id: int, created_at: datetime, lines, status: str = "paid") -> int:
+    total = sum(quantity * price for _, quantity, price in lines)
+    result = await db.execute(
+        insert(Order).values(user_id=user_id, total_amount=total, status=status, created_at=created_at).returning(Order.id)
+    )
+    order_id = result.scalar_one()
+    await db.execute(insert(OrderItem), [
+        {"order_id": order_id, "product_id": product_id, "quantity": quantity, "unit_price": price}
+        for product_id, quantity, price in lines
+    ])
+    return order_id
+
+
+@pytest.mark.asyncio
+async def test_rollups_refresh_incrementally_and_serve_reports(client: AsyncClient, db_session):
+    result = await db_session.execute(insert(Category).values(name="Tools").returning(Category.id))
+    category_id = result.scalar_one()
+    result = await db_session.execute(insert(Product).returning(Product.id), [
+        {"sku": "HAMMER", "name": "Hammer", "price": Decimal("10.00"), "stock": 100, "category_id": category_id},
+        {"sku": "MYSTERY", "name": "Mystery box", "price": Decimal("2.50"), "stock": 100, "category_id": None},
+    ])
+    hammer_id, mystery_id = result.scalars().all()
+    result = await db_session.execute(
+        insert(User).values(email="analyst@example.com", password_hash="x", is_active=True, is_admin=True).returning(User.id)
+    )
+    admin_id = result.scalar_one()
+    await place_order(db_session, admin_id, datetime(2024, 5, 1, 9, tzinfo=timezone.utc), [(hammer_id, 2, Decimal("10.00"))])
+    await place_order(db_session, admin_id, datetime(2024, 5, 1, 18, tzinfo=timezone.utc), [
+        (hammer_id, 1, Decimal("10.00")), (mystery_id, 4, Decimal("2.50"))
+    ])
+    await place_order(db_session, admin_id, datetime(2024, 5, 2, 10, tzinfo=timezone.utc), [(mystery_id, 1, Decimal("2.50"))])
+    unpaid_id = await place_order(
+        db_session, admin_id, datetime(2024, 5, 1, 12, tzinfo=timezone.utc), [(hammer_id, 5, Decimal("10.00"))], status="pending"
+    )
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin_id)})}"}
+    window = {"date_from": "2024-05-01", "date_to": "2024-05-31"}
+
+    response = await client.post("/api/v1/analytics/refresh", headers=headers)
+    assert response.json()["days"] == 2
+
+    response = await client.get("/api/v1/analytics/sales", params=window, headers=headers)
+    body = response.json()
+    assert [(day["day"], day["orders"], day["units"]) for day in body["days"]] == [("2024-05-01", 2, 7), ("2024-05-02", 1, 1)]
+    assert Decimal(body["totals"]["revenue"]) == Decimal("42.50")
+
+    response = await client.get("/api/v1/analytics/categories", params=window, headers=headers)
+    assert {row["category_id"]: Decimal(row["revenue"]) for row in response.json()} == {
+        category_id: Decimal("30.00"), None: Decimal("12.50")
+    }
+
+    # Only the day inside the lag window and the new day are rebuilt.
+    await place_order(db_session, admin_id, datetime(2024, 5, 3, 9, tzinfo=timezone.utc), [(hammer_id, 3, Decimal("10.00"))])
+    await db_session.commit()
+    response = await client.post("/api/v1/analytics/refresh", headers=headers)
+    assert (response.json()["first_day"], response.json()["days"]) == ("2024-05-02", 2)
+
+    response = await client.get("/api/v1/analytics/products", params=window, headers=headers)
+    assert [(row["product_id"], row["orders"], row["units"]) for row in response.json()] == [(hammer_id, 3, 6), (mystery_id, 2, 5)]
+
+    response = await client.post("/api/v1/analytics/refresh", headers=headers)
+    assert response.json()["days"] == 0
+
+    # A payment landing later rebuilds the order's day even though created_at is long past the watermark.
+    await db_session.execute(update(Order).where(Order.id == unpaid_id).values(status="paid"))
+    await db_session.commit()
+    response = await client.post("/api/v1/analytics/refresh", headers=headers)
+    assert (response.json()["first_day"], response.json()["days"]) == ("2024-05-01", 1)
+
+    response = await client.get("/api/v1/analytics/products", params=window, headers=headers)
+    assert [(row["product_id"], row["orders"], row["units"]) for row in response.json()] == [(hammer_id, 4, 11), (mystery_id, 2, 5)]
+
+
+@pytest.mark.asyncio
+async def test_analytics_requires_admin(client: AsyncClient, db_session):
+    response = await client.get("/api/v1/analytics/sales")
+    assert response.status_code == 403
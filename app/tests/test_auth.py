@@ -1,5 +1,15 @@
 import pytest
+from datetime import timedelta
+from fastapi import HTTPException
 from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy import insert, select
+
+from app.core import redis_pool, security
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.core.security import pwd_context
+from app.db.models.user import User
+from app.services.password_service import PasswordService
 
 
 @pytest.mark.asyncio
@@ -87,3 +97,103 @@ async def test_login_wrong_password(client: AsyncClient):
         }
     )
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(client: AsyncClient, db_session):
+    weak_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    db_session.add(User(email="legacy@example.com", password_hash=weak_context.hash("testpass123"), is_active=True))
+    await db_session.commit()
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": "legacy@example.com",
+            "password": "testpass123"
+        }
+    )
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    result = await db_session.execute(select(User).where(User.email == "legacy@example.com"))
+    user = result.scalar_one()
+    assert not pwd_context.needs_update(user.password_hash)
+
+
+@pytest.mark.asyncio
+async def test_password_service_rejects_when_queue_full():
+    service = PasswordService(max_workers=1, max_pending=0)
+    with pytest.raises(HTTPException) as exc_info:
+        await service.hash("testpass123")
+    assert exc_info.value.status_code == 503
+
+
+def test_decoded_tokens_are_cached_until_expiry(monkeypatch):
+    calls = []
+    real_decode = security.decode_token
+
+    def counting_decode(token):
+        calls.append(token)
+        return real_decode(token)
+
+    monkeypatch.setattr(security, "decode_token", counting_decode)
+    token = security.create_access_token(data={"sub": "41"})
+    expired = security.create_access_token(data={"sub": "42"}, expires_delta=timedelta(seconds=-1))
+
+    assert security.decode_token_cached(token)["sub"] == "41"
+    assert security.decode_token_cached(token)["sub"] == "41"
+    assert security.decode_token_cached(expired) is None
+    assert security.decode_token_cached(expired) is None
+    assert calls == [token, expired, expired]
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_and_invalidated_after_commit(client: AsyncClient, db_session, query_counter, monkeypatch):
+    monkeypatch.setattr(principal_cache, "use_redis", True)
+    monkeypatch.setattr(principal_cache, "_redis", redis_pool.get_redis_client())
+    result = await db_session.execute(
+        insert(User).values(email="cached@example.com", password_hash="x", is_active=True, is_admin=False).returning(User.id)
+    )
+    user_id = result.scalar_one()
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {security.create_access_token(data={'sub': str(user_id)})}"}
+
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    query_counter.clear()
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    assert not any("FROM users" in statement for statement in query_counter)
+
+    _, version = await principal_cache.get(user_id)
+    user = await db_session.get(User, user_id)
+    user.is_active = False
+    await db_session.flush()
+    # A request that read the old row before commit may still cache it; the commit must clear it.
+    await principal_cache.set(User(id=user_id, email="cached@example.com", is_active=True, is_admin=False), version)
+    await db_session.commit()
+
+    assert principal_cache.local.get(principal_cache.key(user_id)) is None
+    assert await principal_cache.redis.get(principal_cache.key(user_id)) is None
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_principal_invalidation_reaches_other_workers_without_shared_tier(db_session, monkeypatch):
+    # Another API worker: a local-only cache of its own, sharing nothing but the version keys.
+    other_worker = PrincipalCache(use_redis=False)
+    other_worker._redis = redis_pool.get_redis_client()
+    monkeypatch.setattr(principal_cache, "_redis", other_worker._redis)
+    result = await db_session.execute(
+        insert(User).values(email="demoted@example.com", password_hash="x", is_active=True, is_admin=True).returning(User.id)
+    )
+    user_id = result.scalar_one()
+    await db_session.commit()
+
+    user, version = await other_worker.get(user_id)
+    assert user is None
+    await other_worker.set(await db_session.get(User, user_id), version)
+    assert (await other_worker.get(user_id))[0].is_admin
+
+    (await db_session.get(User, user_id)).is_admin = False
+    await db_session.commit()
+
+    assert (await other_worker.get(user_id))[0] is None
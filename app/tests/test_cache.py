@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from app.core import redis_pool
+from app.core.cache import LRUCache
+from app.services.product_cache import PRODUCT_LIST_VERSION_KEY, ProductCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_delete_prefix():
+    cache = LRUCache()
+    cache.set("catalog:products:list:1", [])
+    cache.set("catalog:products:list:2", [])
+    cache.set("catalog:product:1", {})
+    cache.delete_prefix("catalog:products:list:")
+
+    assert len(cache) == 1
+    assert cache.get("catalog:product:1") == {}
+
+
+@pytest.mark.asyncio
+async def test_list_fill_from_before_invalidation_is_not_served():
+    cache = ProductCache()
+    cache._redis = redis_pool.get_redis_client()
+    key = cache.product_list_key({"limit": 10})
+    await cache.clear()
+
+    value, fill = await cache.get_list(key)
+    assert value is None
+    await cache.invalidate_products([1])
+    await cache.set_list(key, [{"id": 1, "name": "stale"}], fill)
+
+    value, _ = await cache.get_list(key)
+    assert value is None
+    # Asserted against Redis itself, so the test cannot pass by Redis being unreachable.
+    assert await cache.redis.get(PRODUCT_LIST_VERSION_KEY) == "1"
+    assert await cache.redis.get(await cache._versioned_list_key(key)) is None
+    await cache.clear()
+    await redis_pool.close_redis_pool()
+
+
+@pytest.mark.asyncio
+async def test_product_fill_from_before_invalidation_is_not_served():
+    cache = ProductCache()
+    cache._redis = redis_pool.get_redis_client()
+    key = cache.product_key(1)
+    await cache.clear()
+
+    value, fill = await cache.get(key)
+    assert value is None
+    await cache.invalidate_product(1)
+    await cache.set(key, {"id": 1, "name": "stale"}, fill)
+
+    assert await cache.redis.get(key) is None
+    cache.local.clear()
+    value, fill = await cache.get(key)
+    assert value is None
+    await cache.set(key, {"id": 1, "name": "fresh"}, fill)
+    assert await cache.redis.get(key) is not None
+    await cache.clear()
+    await redis_pool.close_redis_pool()
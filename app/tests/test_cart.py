@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.core.redis_pool import get_redis_client, close_redis_pool
+from app.services.cart_store import CartStore
+
+USER_ID = 987654321
+
+
+@pytest.fixture(scope="function")
+async def cart():
+    store = CartStore(ttl_seconds=60)
+    client = get_redis_client()
+    await store.clear(client, USER_ID)
+    yield store, client
+    await store.clear(client, USER_ID)
+    await close_redis_pool()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_adds_never_exceed_stock(cart):
+    store, client = cart
+
+    results = await asyncio.gather(*[store.add_item(client, USER_ID, 1, 1, 30) for _ in range(100)])
+
+    accepted = [quantity for quantity in results if quantity is not None]
+    assert len(accepted) == 30
+    assert sorted(accepted) == list(range(1, 31))
+    assert await store.get_items(client, USER_ID) == {"1": "30"}
+    assert 0 < await client.ttl(store.key(USER_ID)) <= 60
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_and_removals(cart):
+    store, client = cart
+
+    await asyncio.gather(*[store.add_item(client, USER_ID, product_id, 2, 10) for product_id in range(20)])
+    await asyncio.gather(
+        *[store.set_item(client, USER_ID, product_id, 5, 10) for product_id in range(10)],
+        *[store.remove_item(client, USER_ID, product_id) for product_id in range(10, 20)]
+    )
+
+    assert await store.get_items(client, USER_ID) == {str(product_id): "5" for product_id in range(10)}
+    assert await store.set_item(client, USER_ID, 0, 11, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_apply_items_in_one_transaction(cart):
+    store, client = cart
+
+    results = await store.apply_items(client, USER_ID, [(1, 2, 5), (2, 1, 5), (1, 4, 5)], "add")
+
+    assert results == [2, 1, None]
+    assert await store.get_items(client, USER_ID) == {"1": "2", "2": "1"}
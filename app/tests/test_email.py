@@ -0,0 +1,72 @@
+import smtplib
+
+import pytest
+
+from app.services.email_service import EmailDispatcher, EmailService, render_template
+from app.services.email_transport import EmailTransport, EmailTransportError, FileTransport, SMTPTransport
+
+
+class FakeSMTP:
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.drop_next = False
+        FakeSMTP.opened.append(self)
+
+    def send_message(self, message):
+        if self.drop_next:
+            self.drop_next = False
+            raise smtplib.SMTPServerDisconnected("idle timeout")
+        self.sent.append(message)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_render_template_matches_order_confirmation():
+    subject, body = render_template("order_confirmation", order_id=42, total_amount=19.99)
+
+    assert subject == "Order Confirmation - Order #42"
+    assert "Total Amount: $19.99" in body
+
+
+def test_send_now_raises_transport_failures():
+    class DownTransport(EmailTransport):
+        def send_batch(self, messages):
+            raise EmailTransportError("SMTP connection failed")
+
+    dispatcher = EmailDispatcher(transport=DownTransport(), rate_per_second=0)
+
+    with pytest.raises(EmailTransportError):
+        dispatcher.send_now([EmailService.build_message(["a@example.com"], "Hi", "Body")])
+    assert dispatcher.stats()["failed"] == 1
+
+
+def test_smtp_transport_reuses_connections(monkeypatch):
+    FakeSMTP.opened = []
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    transport = SMTPTransport(host="smtp.test", port=25, pool_size=2)
+    messages = [EmailService.build_message(["a@example.com"], "Hi", "Body") for _ in range(10)]
+
+    for _ in range(5):
+        assert transport.send_batch(messages) == 10
+    assert len(FakeSMTP.opened) == 1
+
+    FakeSMTP.opened[0].drop_next = True
+    assert transport.send_batch(messages) == 10
+    assert len(FakeSMTP.opened) == 2
+    transport.close()
+
+
+def test_file_transport_writes_eml(tmp_path):
+    transport = FileTransport(directory=str(tmp_path))
+
+    transport.send_batch([EmailService.build_message(["a@example.com"], "Hi", "Body")])
+
+    files = list(tmp_path.glob("*.eml"))
+    assert len(files) == 1
+    assert b"Subject: Hi" in files[0].read_bytes()
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app.core.redis_pool import get_redis_client, close_redis_pool
+from app.services.cart_store import cart_store
+from app.services.inventory_service import InventoryStore
+
+USER_ID = 876543210
+PRODUCT_ID = 1
+
+
+@pytest.fixture(scope="function")
+async def inventory():
+    store = InventoryStore(hold_ttl_seconds=60, prefix="test-inventory")
+    client = get_redis_client()
+
+    async def cleanup():
+        keys = [key async for key in client.scan_iter(match="test-inventory:*")]
+        keys += [cart_store.key(USER_ID + offset) for offset in range(50)]
+        await client.delete(*keys)
+
+    await cleanup()
+    yield store, client
+    await cleanup()
+    await close_redis_pool()
+
+
+async def stock_of(value: int):
+    return value
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reservations_never_exceed_stock(inventory):
+    store, client = inventory
+
+    results = await asyncio.gather(*[
+        store.reserve(client, USER_ID + offset, PRODUCT_ID, 1, "add", lambda: stock_of(30))
+        for offset in range(50)
+    ])
+
+    assert sum(1 for quantity in results if quantity is not None) == 30
+    assert await store.available(client, PRODUCT_ID) == 0
+    assert await client.get(store.held_key(PRODUCT_ID)) == "30"
+
+
+@pytest.mark.asyncio
+async def test_release_returns_stock_and_keeps_cart_in_step(inventory):
+    store, client = inventory
+    loads = []
+
+    async def load_stock():
+        loads.append(PRODUCT_ID)
+        return 10
+
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, 4, "add", load_stock) == 4
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, 3, "add", load_stock) == 7
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, 5, "set", load_stock) == 5
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, 6, "add", load_stock) is None
+    assert loads == [PRODUCT_ID]
+    assert await store.available(client, PRODUCT_ID) == 5
+    assert await cart_store.get_items(client, USER_ID) == {"1": "5"}
+
+    assert await store.release(client, USER_ID, PRODUCT_ID)
+    assert await store.available(client, PRODUCT_ID) == 10
+    assert await cart_store.get_items(client, USER_ID) == {}
+
+
+@pytest.mark.asyncio
+async def test_non_positive_quantities_leave_counters_alone(inventory):
+    store, client = inventory
+
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, 4, "add", lambda: stock_of(10)) == 4
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, -3, "add", lambda: stock_of(10)) is None
+    assert await store.reserve(client, USER_ID, PRODUCT_ID, 0, "set", lambda: stock_of(10)) is None
+    assert await store.available(client, PRODUCT_ID) == 6
+    assert await cart_store.get_items(client, USER_ID) == {"1": "4"}
+
+
+@pytest.mark.asyncio
+async def test_release_expired_skips_refreshed_holds(inventory):
+    store, client = inventory
+    await store.reserve(client, USER_ID, PRODUCT_ID, 2, "add", lambda: stock_of(10))
+    await store.reserve(client, USER_ID + 1, PRODUCT_ID, 3, "add", lambda: stock_of(10))
+    await client.zadd(store.expiry_key, {str(USER_ID): 100})
+
+    assert await store.release_expired(client, now=1000) == 1
+    assert await store.get_holds(client, USER_ID) == {}
+    assert await store.get_holds(client, USER_ID + 1) == {PRODUCT_ID: 3}
+    assert await store.available(client, PRODUCT_ID) == 7
+
+
+@pytest.mark.asyncio
+async def test_consume_and_sync_track_database_stock(inventory):
+    store, client = inventory
+    await store.reserve(client, USER_ID, PRODUCT_ID, 2, "add", lambda: stock_of(10))
+    await store.reserve(client, USER_ID, 2, 1, "add", lambda: stock_of(5))
+    await store.reserve(client, USER_ID + 1, PRODUCT_ID, 3, "add", lambda: stock_of(10))
+
+    # Checkout ordered two of product 1; products.stock drops from 10 to 8.
+    await store.consume(client, USER_ID, {PRODUCT_ID: 2})
+
+    assert await store.available(client, PRODUCT_ID) == 5
+    assert await store.available(client, 2) == 5
+    assert await cart_store.get_items(client, USER_ID) == {}
+
+    await client.set(store.stock_key(PRODUCT_ID), 99)
+    await store.sync(client, {PRODUCT_ID: 8})
+    assert await store.available(client, PRODUCT_ID) == 5
+    assert await store.tracked_products(client) == [PRODUCT_ID, 2]
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_counters_moved_since_stock_was_read(inventory):
+    store, client = inventory
+    await store.reserve(client, USER_ID, PRODUCT_ID, 2, "add", lambda: stock_of(10))
+    versions = await store.versions(client, [PRODUCT_ID])
+
+    # A checkout commits (stock 10 -> 8) after the reconciler read 10 from the database.
+    await store.consume(client, USER_ID, {PRODUCT_ID: 2})
+    assert await store.sync(client, {PRODUCT_ID: 10}, versions) == 0
+    assert await store.available(client, PRODUCT_ID) == 8
+
+    assert await store.sync(client, {PRODUCT_ID: 8}, await store.versions(client, [PRODUCT_ID])) == 1
+    assert await store.available(client, PRODUCT_ID) == 8
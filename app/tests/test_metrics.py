@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+from decimal import Decimal
+from httpx import AsyncClient
+
+from app.core.metrics import metrics_registry
+from app.core.redis_pool import InstrumentedConnectionPool
+from app.db.models.product import Product
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_db_queries(client: AsyncClient, db_session):
+    db_session.add(Product(sku="MET-1", name="Metered", price=Decimal("1.00"), stock=1))
+    await db_session.commit()
+
+    response = await client.get("/api/v1/products")
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert 'desc="1 queries"' in timing
+    assert "app;dur=" in timing
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_route_histograms(client: AsyncClient, db_session):
+    metrics_registry.reset()
+
+    await client.get("/api/v1/products/999")
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/products/{product_id}",status="404"} 1' in body
+    assert 'http_request_db_queries_bucket{method="GET",route="/api/v1/products/{product_id}",le="1"} 1' in body
+
+
+class IdleConnection:
+    def __init__(self, **kwargs):
+        pass
+
+    async def connect(self):
+        pass
+
+    async def can_read_destructive(self):
+        return False
+
+    async def disconnect(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_redis_pool_waits_for_a_free_connection_and_counts_timeouts():
+    pool = InstrumentedConnectionPool(max_connections=1, timeout=0.05, connection_class=IdleConnection)
+    connection = await pool.get_connection("GET")
+
+    with pytest.raises(redis.ConnectionError):
+        await pool.get_connection("GET")
+    assert (pool.created, pool.in_use, pool.timeouts) == (1, 1, 1)
+
+    waiter = asyncio.create_task(pool.get_connection("GET"))
+    await pool.release(connection)
+    assert await waiter is connection
+    await pool.release(connection)
+    assert (pool.created, pool.in_use, pool.timeouts) == (1, 0, 1)
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from app.core.security import create_access_token
+from app.db.models.user import User
+from app.db.models.product import Product
+from app.db.models.order import Order, OrderItem
+from app.services.email_service import EmailService
+from app.services.product_cache import product_cache
+from app.worker import tasks
+from app.worker.celery_app import celery_app
+
+
+async def seed_orders(db, order_count: int) -> int:
+    result = await db.execute(
+        insert(User).values(email="orders@example.com", password_hash="x", is_active=True).returning(User.id)
+    )
+    user_id = result.scalar_one()
+    await db.execute(insert(Product), [
+        {"sku": f"ORD-{i}", "name": f"Product {i}", "price": Decimal("5.00"), "stock": 10}
+        for i in range(3)
+    ])
+    product_ids = (await db.execute(select(Product.id))).scalars().all()
+
+    result = await db.execute(
+        insert(Order).returning(Order.id),
+        [{"user_id": user_id, "total_amount": Decimal("15.00"), "status": "pending"} for _ in range(order_count)]
+    )
+    order_ids = result.scalars().all()
+    await db.execute(insert(OrderItem), [
+        {"order_id": order_id, "product_id": product_id, "quantity": 1, "unit_price": Decimal("5.00")}
+        for order_id in order_ids
+        for product_id in product_ids
+    ])
+    await db.commit()
+    return user_id
+
+
+@pytest.mark.asyncio
+async def test_list_orders_query_count_is_constant(client: AsyncClient, db_session, query_counter):
+    user_id = await seed_orders(db_session, 100)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    query_counter.clear()
+
+    response = await client.get("/api/v1/orders", headers=headers)
+
+    assert response.status_code == 200
+    orders = response.json()
+    assert len(orders) == 100
+    assert all(len(order["items"]) == 3 for order in orders)
+    # user lookup, orders page, items for the whole page
+    assert len(query_counter) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_order_includes_items(client: AsyncClient, db_session):
+    user_id = await seed_orders(db_session, 1)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+
+    orders = (await client.get("/api/v1/orders", headers=headers)).json()
+    response = await client.get(f"/api/v1/orders/{orders[0]['id']}", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_checkout_queues_confirmation_email(client: AsyncClient, db_session, monkeypatch):
+    sent = []
+
+    def record_email(to, subject, body):
+        sent.append((to, subject))
+        return 1
+
+    monkeypatch.setattr(EmailService, "deliver", staticmethod(record_email))
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(tasks, "send_payment_followup", MagicMock())
+    monkeypatch.setattr(tasks, "invalidate_products", MagicMock())
+
+    user_id = await seed_orders(db_session, 1)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    product_id = (await db_session.execute(select(Product.id))).scalars().first()
+
+    response = await client.post("/api/v1/cart/items", json={"product_id": product_id, "quantity": 2}, headers=headers)
+    assert response.status_code == 201
+    response = await client.post("/api/v1/orders", headers=headers)
+    assert response.status_code == 201
+
+    order_id = response.json()["id"]
+    assert sent == [(["orders@example.com"], f"Order Confirmation - Order #{order_id}")]
+    tasks.send_payment_followup.apply_async.assert_not_called()
+    tasks.invalidate_products.delay.assert_called_once_with([product_id])
+
+
+@pytest.mark.asyncio
+async def test_eager_checkout_runs_side_effects_inline(client: AsyncClient, db_session, monkeypatch):
+    sent = []
+
+    def record_email(to, subject, body):
+        sent.append(subject)
+        return 1
+
+    monkeypatch.setattr(EmailService, "deliver", staticmethod(record_email))
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+
+    user_id = await seed_orders(db_session, 1)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    product_id = (await db_session.execute(select(Product.id))).scalars().first()
+    assert (await client.get(f"/api/v1/products/{product_id}")).status_code == 200
+    assert product_cache.local.get(product_cache.product_key(product_id)) is not None
+
+    await client.post("/api/v1/cart/items", json={"product_id": product_id, "quantity": 2}, headers=headers)
+    response = await client.post("/api/v1/orders", headers=headers)
+    assert response.status_code == 201
+
+    # The reminder is not sent at checkout, and the cache task ran on its own Redis client
+    # without tearing down the API's pool.
+    assert sent == [f"Order Confirmation - Order #{response.json()['id']}"]
+    assert product_cache.local.get(product_cache.product_key(product_id)) is None
+
+
+@pytest.mark.asyncio
+async def test_admin_export_streams_orders_with_items(client: AsyncClient, db_session):
+    await seed_orders(db_session, 5)
+    result = await db_session.execute(
+        insert(User).values(email="finance@example.com", password_hash="x", is_active=True, is_admin=True).returning(User.id)
+    )
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(result.scalar_one())})}"}
+
+    response = await client.get("/api/v1/orders/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    assert len(orders) == 5
+    assert all(len(order["items"]) == 3 for order in orders)
+
+    response = await client.get("/api/v1/orders/export?format=csv&status=pending", headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][0] == "order_id"
+    assert len(rows) == 1 + 15
+
+    response = await client.get("/api/v1/orders/export?format=csv&status=paid", headers=headers)
+    assert len(response.text.splitlines()) == 1
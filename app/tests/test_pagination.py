@@ -0,0 +1,20 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("orders", {"created_at": "2024-01-01T00:00:00", "id": 42})
+    assert decode_cursor("orders", cursor) == {"created_at": "2024-01-01T00:00:00", "id": 42}
+
+
+def test_cursor_rejects_tampering():
+    cursor = encode_cursor("products", {"id": 10})
+    _, signature = cursor.split(".")
+    forged = encode_cursor("products", {"id": 99}).split(".")[0]
+
+    with pytest.raises(HTTPException):
+        decode_cursor("products", f"{forged}.{signature}")
+    with pytest.raises(HTTPException):
+        decode_cursor("orders", cursor)
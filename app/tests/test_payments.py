@@ -0,0 +1,127 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models.user import User
+from app.db.models.order import Order
+from app.db.models.payment_event import StripeEvent
+from app.services.payment_service import PaymentService
+from app.services.stripe_gateway import StripeGateway, PaymentGatewayError
+from app.services.webhook_service import WebhookProcessor
+from app.tests.fake_stripe import create_fake_stripe_app
+
+WEBHOOK_SECRET = "whsec_test"
+
+
+def build_gateway(fake_app, max_retries: int = 2) -> StripeGateway:
+    return StripeGateway(
+        api_key="sk_test_fake",
+        api_base="http://fake-stripe",
+        max_retries=max_retries,
+        transport=httpx.ASGITransport(app=fake_app)
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_payment_intent_is_idempotent():
+    fake_app = create_fake_stripe_app()
+    gateway = build_gateway(fake_app)
+
+    first = await gateway.create_payment_intent(1999, "usd", {"order_id": "7"}, idempotency_key="order-7-payment-intent")
+    second = await gateway.create_payment_intent(1999, "usd", {"order_id": "7"}, idempotency_key="order-7-payment-intent")
+    await gateway.close()
+
+    assert first.id == second.id
+    assert first.client_secret.startswith(first.id)
+    assert first.metadata["order_id"] == "7"
+    assert len(fake_app.state.intents) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_payment_intent_retries_server_errors():
+    fake_app = create_fake_stripe_app(failures=2)
+    gateway = build_gateway(fake_app, max_retries=2)
+
+    intent = await gateway.create_payment_intent(500, "usd", {}, idempotency_key="order-1-payment-intent")
+    await gateway.close()
+
+    assert intent.amount == 500
+    assert fake_app.state.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_create_payment_intent_gives_up_after_retries():
+    fake_app = create_fake_stripe_app(failures=5)
+    gateway = build_gateway(fake_app, max_retries=1)
+
+    with pytest.raises(PaymentGatewayError) as exc_info:
+        await gateway.create_payment_intent(500, "usd", {})
+    await gateway.close()
+
+    assert exc_info.value.status_code == 500
+    assert fake_app.state.requests == 2
+
+
+def signed_webhook(event: dict):
+    payload = json.dumps(event)
+    timestamp = int(time.time())
+    signature = hmac.new(WEBHOOK_SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return payload, {"stripe-signature": f"t={timestamp},v1={signature}", "content-type": "application/json"}
+
+
+def payment_succeeded_event(event_id: str, order_id: int) -> dict:
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {"id": f"pi_{order_id}", "object": "payment_intent", "metadata": {"order_id": str(order_id)}}}
+    }
+
+
+@pytest.mark.asyncio
+async def test_webhook_events_are_deduplicated_and_batched(client: AsyncClient, db_session, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "STRIPE_WEBHOOK_SECRET", WEBHOOK_SECRET)
+    user = User(email="webhook@example.com", password_hash="x", is_active=True)
+    db_session.add(user)
+    await db_session.flush()
+    orders = [Order(user_id=user.id, total_amount=Decimal("10.00"), status="pending") for _ in range(3)]
+    db_session.add_all(orders)
+    await db_session.commit()
+
+    for index, order in enumerate(orders):
+        payload, headers = signed_webhook(payment_succeeded_event(f"evt_{index}", order.id))
+        for _ in range(2):
+            response = await client.post("/api/v1/payments/webhook", content=payload, headers=headers)
+            assert response.status_code == 200
+
+    events = (await db_session.execute(select(StripeEvent))).scalars().all()
+    assert len(events) == 3
+    assert {event.status for event in events} == {"pending"}
+
+    processor = WebhookProcessor(session_factory=session_factory, batch_size=2)
+    assert await processor.drain() == 3
+    assert processor.metrics.batches == 2
+
+    db_session.expire_all()
+    statuses = (await db_session.execute(select(Order.status))).scalars().all()
+    assert statuses == ["paid", "paid", "paid"]
+    events = (await db_session.execute(select(StripeEvent.status))).scalars().all()
+    assert events == ["processed", "processed", "processed"]
+
+
+def test_idempotency_key_is_namespaced_per_deployment_and_order():
+    created_at = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+    key = PaymentService.idempotency_key(7, created_at, prefix="prod")
+
+    assert key == PaymentService.idempotency_key(7, created_at, prefix="prod")
+    assert key != PaymentService.idempotency_key(7, created_at, prefix="staging")
+    assert key != PaymentService.idempotency_key(7, created_at.replace(day=2), prefix="prod")
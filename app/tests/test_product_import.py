@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core import redis_pool
+from app.core.security import create_access_token
+from app.db.session import Base
+from app.db.models.product import Category, Product
+from app.db.models.user import User
+from app.services.inventory_service import inventory_store
+from app.services import product_import
+from app.services.product_import import ProductImporter, iter_csv_rows
+
+
+async def admin_headers(db) -> dict:
+    result = await db.execute(
+        insert(User).values(email="import-admin@example.com", password_hash="x", is_active=True, is_admin=True)
+        .returning(User.id)
+    )
+    await db.commit()
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(result.scalar_one())})}"}
+
+
+@pytest.mark.asyncio
+async def test_csv_import_upserts_by_sku_and_reports_bad_rows(client: AsyncClient, db_session):
+    headers = await admin_headers(db_session)
+    db_session.add(Product(sku="IMP-1", name="Old name", price="1.00", stock=1))
+    await db_session.commit()
+
+    body = (
+        "sku,name,description,price,stock\n"
+        'IMP-1,New name,"Two\nlines",2.50,5\n'
+        "IMP-2,Second,,3.00,7\n"
+        "IMP-3,Broken,,not-a-price,1\n"
+        "IMP-4,Short row\n"
+        "IMP-5,Blank stock,,1.00,\n"
+    )
+    response = await client.post(
+        "/api/v1/products/import", content=body.encode(), headers={**headers, "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["inserted"], report["updated"], report["failed"]) == (5, 2, 1, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    assert report["errors"][0]["sku"] == "IMP-3"
+
+    products = {p.sku: p for p in (await db_session.execute(select(Product).execution_options(populate_existing=True))).scalars()}
+    assert products["IMP-1"].name == "New name"
+    assert products["IMP-1"].description == "Two\nlines"
+    assert products["IMP-2"].stock == 7
+    assert products["IMP-5"].stock == 0
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import_streams_across_body_chunks(client: AsyncClient, db_session):
+    headers = await admin_headers(db_session)
+    lines = [json.dumps({"sku": f"ND-{i}", "name": f"Item {i}", "price": "4.20", "stock": i}) for i in range(25)]
+
+    async def body():
+        for start in range(0, len(lines), 7):
+            yield ("\n".join(lines[start:start + 7]) + "\n").encode()
+
+    response = await client.post(
+        "/api/v1/products/import?format=ndjson", content=body(), headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 25
+    imported = dict((await db_session.execute(select(Product.sku, Product.id).where(Product.sku.like("ND-%")))).all())
+    assert len(imported) == 25
+    assert await inventory_store.available(redis_pool.get_redis_client(), imported["ND-7"]) == 7
+
+
+@pytest.mark.asyncio
+async def test_csv_quote_inside_unquoted_field_is_literal():
+    async def lines():
+        for line in ("sku,name,price,stock", 'TV-1,5" tv,1.00,1', 'TV-2,"Wall ""mount""', 'kit",2.00,2', "TV-3,Remote,3.00,3"):
+            yield line
+
+    rows = [row async for row in iter_csv_rows(lines())]
+
+    assert [row["name"] for row in rows] == ['5" tv', 'Wall "mount"\nkit', "Remote"]
+
+
+@pytest.mark.asyncio
+async def test_overlong_line_stops_import_with_partial_report(client: AsyncClient, db_session, monkeypatch):
+    monkeypatch.setattr(product_import, "MAX_LINE_LENGTH", 64)
+    headers = await admin_headers(db_session)
+
+    async def body():
+        yield b"sku,name,price,stock\nOK-1,Kept,1.00,1\n"
+        yield b"OK-2," + b"x" * 100
+
+    response = await client.post("/api/v1/products/import?format=csv", content=body(), headers=headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["inserted"], report["failed"], report["aborted"]) == (2, 1, 1, True)
+    assert "longer than 64" in report["errors"][0]["errors"][0]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_upsert_path():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Category.__table__, Product.__table__])
+
+    async def body():
+        yield b'{"sku": "SQ-1", "name": "One", "price": "1.00", "stock": 1}\n{"sku": "SQ-2", "name": "Two", "price": "2.00"}\n'
+
+    async def update():
+        yield b'{"sku": "SQ-1", "name": "One again", "price": "1.50", "stock": 3}\n'
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        first = await ProductImporter(db, "ndjson").run(body())
+        second = await ProductImporter(db, "ndjson").run(update())
+        products = dict((await db.execute(select(Product.sku, Product.stock))).all())
+    await engine.dispose()
+
+    assert (first["inserted"], first["updated"]) == (2, 0)
+    assert (second["inserted"], second["updated"]) == (0, 1)
+    assert products == {"SQ-1": 3, "SQ-2": 0}
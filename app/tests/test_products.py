@@ -1,5 +1,10 @@
 import pytest
+from decimal import Decimal
 from httpx import AsyncClient
+from sqlalchemy import insert
+
+from app.db.models.product import Product
+from app.services.product_cache import product_cache
 
 
 @pytest.mark.asyncio
@@ -14,3 +19,37 @@ async def test_product_health_check(client: AsyncClient):
     response = await client.get("/api/v1/products/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_catalog_endpoints_answer_conditional_requests(client: AsyncClient, db_session):
+    result = await db_session.execute(
+        insert(Product).values(sku="LAMP", name="Lamp", price=Decimal("30.00"), stock=5).returning(Product.id)
+    )
+    product_id = result.scalar_one()
+    await db_session.commit()
+
+    for path in (f"/api/v1/products/{product_id}", "/api/v1/products", "/api/v1/products/categories/list"):
+        response = await client.get(path)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert etag.startswith('"') and response.headers["cache-control"].startswith("public")
+
+        response = await client.get(path, headers={"If-None-Match": f'W/"stale", {etag}'})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        response = await client.get(path, headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+
+    path = f"/api/v1/products/{product_id}"
+    response = await client.get(path)
+    # The ETag is stored with the cached entry rather than rehashed from each response body.
+    assert product_cache.local.get(product_cache.product_key(product_id))["etag"] == response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+    response = await client.get(path, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    response = await client.get(path, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert response.status_code == 200
+    assert response.json()["sku"] == "LAMP"
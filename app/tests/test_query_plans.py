@@ -0,0 +1,68 @@
+import json
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, insert, text
+from sqlalchemy.dialects import postgresql
+
+from app.db.models.user import User
+from app.db.models.product import Product, Category
+from app.db.models.order import Order, OrderItem
+
+HOT_QUERIES = {
+    "list_orders": lambda: (
+        select(Order)
+        .where(Order.user_id == 1)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(100)
+    ),
+    "order_items_by_order": lambda: select(OrderItem).where(OrderItem.order_id.in_([1, 2, 3])),
+    "products_by_category_and_price": lambda: (
+        select(Product)
+        .where(Product.category_id == 1, Product.price >= 10, Product.price <= 20)
+    ),
+    "products_by_price_range": lambda: select(Product).where(Product.price >= 10, Product.price <= 20),
+    "order_by_payment_intent": lambda: select(Order).where(Order.payment_intent_id == "pi_123"),
+}
+
+
+def scan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from scan_nodes(child)
+
+
+async def seed(db):
+    await db.execute(insert(User).values(id=1, email="plans@example.com", password_hash="x"))
+    await db.execute(insert(Category).values(id=1, name="Plans"))
+    await db.execute(insert(Product), [
+        {"sku": f"PLAN-{i}", "name": f"Product {i}", "price": Decimal(i % 50), "stock": 10, "category_id": 1 if i % 2 else None}
+        for i in range(500)
+    ])
+    await db.execute(insert(Order), [
+        {"user_id": 1, "total_amount": Decimal("10"), "status": "paid", "payment_intent_id": f"pi_{i}"}
+        for i in range(200)
+    ])
+    await db.execute(insert(OrderItem), [
+        {"order_id": i // 3 + 1, "product_id": i % 500 + 1, "quantity": 1, "unit_price": Decimal("10")}
+        for i in range(600)
+    ])
+    await db.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_uses_index(db_session, name):
+    await seed(db_session)
+    await db_session.execute(text("ANALYZE"))
+    # With sequential scans disabled the planner still picks one if no index can serve the query.
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    sql = HOT_QUERIES[name]().compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    seq_scans = [node["Relation Name"] for node in scan_nodes(plan[0]["Plan"]) if node["Node Type"] == "Seq Scan"]
+    assert not seq_scans, f"{name} falls back to a sequential scan on {seq_scans}"
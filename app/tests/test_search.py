@@ -0,0 +1,33 @@
+from app.db.models.product import Product
+from app.services.search_service import InMemorySearchBackend
+
+
+def build_backend(*products):
+    backend = InMemorySearchBackend()
+    backend._built = True
+    for product in products:
+        backend.index_product(product)
+    return backend
+
+
+def test_memory_search_ranks_name_matches_first():
+    backend = build_backend(
+        Product(id=1, name="Wool socks", description="Pairs well with running shoes"),
+        Product(id=2, name="Running shoes", description="Lightweight"),
+        Product(id=3, name="Rain jacket", description=None),
+    )
+
+    assert backend.search("running shoe") == [2, 1]
+    assert backend.search("jacket") == [3]
+    assert backend.search("sandals") == []
+
+
+def test_memory_search_reindexes_and_removes():
+    backend = build_backend(Product(id=1, name="Running shoes", description=None))
+
+    backend.index_product(Product(id=1, name="Trail boots", description=None))
+    assert backend.search("shoes") == []
+    assert backend.search("boots") == [1]
+
+    backend.remove_product(1)
+    assert backend.search("boots") == []
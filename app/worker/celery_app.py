@@ -0,0 +1,39 @@
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "ecommerce",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.worker.tasks"]
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=True,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_ignore_result=True,
+    worker_prefetch_multiplier=4,
+    task_serializer="json",
+    accept_content=["json"],
+    timezone="UTC"
+)
+
+# Periodic jobs are run by the single beat process, so each runs once per interval rather than once per API worker.
+celery_app.conf.beat_schedule = {}
+
+if settings.ANALYTICS_ROLLUP_ENABLED:
+    celery_app.conf.beat_schedule["refresh-sales-rollups"] = {
+        "task": "app.worker.tasks.refresh_sales_rollups",
+        "schedule": settings.ANALYTICS_REFRESH_INTERVAL_SECONDS,
+        "options": {"expires": settings.ANALYTICS_REFRESH_INTERVAL_SECONDS}
+    }
+
+if settings.INVENTORY_RESERVATIONS_ENABLED:
+    celery_app.conf.beat_schedule["reconcile-inventory"] = {
+        "task": "app.worker.tasks.reconcile_inventory",
+        "schedule": settings.INVENTORY_RECONCILE_INTERVAL_SECONDS,
+        "options": {"expires": settings.INVENTORY_RECONCILE_INTERVAL_SECONDS}
+    }
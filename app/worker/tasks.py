@@ -0,0 +1,113 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from celery.signals import worker_process_shutdown
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.redis_pool import create_redis_client
+from app.db.models.order import Order
+from app.db.models.user import User
+from app.services.analytics_service import SalesRollupService
+from app.services.email_service import EmailService, email_dispatcher, render_template
+from app.services.inventory_service import inventory_store
+from app.services.product_cache import product_cache
+from app.worker.celery_app import celery_app
+
+RETRY_OPTIONS = {
+    "autoretry_for": (Exception,),
+    "retry_backoff": True,
+    "retry_backoff_max": 600,
+    "retry_jitter": True,
+    "max_retries": 5
+}
+
+
+@worker_process_shutdown.connect
+def close_email_transport(**kwargs):
+    email_dispatcher.close()
+
+
+@asynccontextmanager
+async def task_session():
+    # Each task runs on a fresh event loop, so it cannot share the API's pooled engine.
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+# Email tasks deliver synchronously, so an EmailTransportError fails the task and
+# autoretry/acks_late cover the actual send.
+@celery_app.task(**RETRY_OPTIONS)
+def send_order_confirmation(email: str, order_id: int, total_amount: float):
+    subject, body = render_template("order_confirmation", order_id=order_id, total_amount=total_amount)
+    EmailService.deliver([email], subject, body)
+
+
+@celery_app.task(**RETRY_OPTIONS)
+def send_payment_followup(order_id: int):
+    async def load_order():
+        async with task_session() as db:
+            result = await db.execute(
+                select(Order.status, Order.total_amount, User.email)
+                .join(User, User.id == Order.user_id)
+                .where(Order.id == order_id)
+            )
+            return result.one_or_none()
+
+    row = asyncio.run(load_order())
+    if row is not None and row.status == "pending":
+        subject, body = render_template("payment_reminder", order_id=order_id, total_amount=float(row.total_amount))
+        EmailService.deliver([row.email], subject, body)
+
+
+@celery_app.task(**RETRY_OPTIONS)
+def invalidate_products(product_ids: List[int]):
+    async def invalidate():
+        client = create_redis_client()
+        try:
+            await product_cache.invalidate_products(product_ids, client)
+        finally:
+            await client.aclose(close_connection_pool=True)
+
+    asyncio.run(invalidate())
+
+
+@celery_app.task
+def refresh_sales_rollups():
+    # No autoretry: a failed pass is simply caught up by the next scheduled one.
+    async def refresh():
+        async with task_session() as db:
+            return await SalesRollupService.refresh(db)
+
+    summary = asyncio.run(refresh())
+    return {"days": summary["days"], "watermark": summary["watermark"].isoformat() if summary["watermark"] else None}
+
+
+@celery_app.task
+def reconcile_inventory():
+    # Like the rollup refresh, a failed pass is left to the next scheduled one.
+    async def reconcile():
+        client = create_redis_client()
+        try:
+            released = await inventory_store.release_expired(client)
+            async with task_session() as db:
+                synced = await inventory_store.reconcile(client, db)
+        finally:
+            await client.aclose(close_connection_pool=True)
+        return {"released_holds": released, "synced_products": synced}
+
+    return asyncio.run(reconcile())
+
+
+def enqueue_order_side_effects(email: str, order_id: int, total_amount: float, product_ids: List[int]):
+    send_order_confirmation.delay(email, order_id, total_amount)
+    if not celery_app.conf.task_always_eager:
+        # Eager mode runs tasks inline and ignores countdown, which would send the reminder at checkout.
+        send_payment_followup.apply_async((order_id,), countdown=settings.PAYMENT_FOLLOWUP_DELAY_SECONDS)
+    invalidate_products.delay(product_ids)
@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+SCENARIOS = ("browse", "search", "cart", "checkout", "webhook_burst")
+SEARCH_WORDS = ("wireless", "organic", "leather", "vintage", "compact", "stainless", "bamboo", "carbon")
+CATEGORY_COUNT = 10
+WEBHOOK_SECRET = "whsec_bench"
+
+
+def configure_environment(workdir: str):
+    # Settings are read at import time, so this has to run before anything under app/ is imported.
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}",
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_RESULT_BACKEND": "cache+memory://",
+        "EMAIL_TRANSPORT": "memory",
+        "STRIPE_WEBHOOK_SECRET": WEBHOOK_SECRET,
+        "SEARCH_BACKEND": "memory",
+    })
+
+
+def install_fake_redis():
+    import fakeredis
+    import redis.asyncio as redis
+    from fakeredis.aioredis import FakeConnection
+    from app.core import redis_pool
+    from app.core.config import settings
+
+    redis_pool._pool = redis.ConnectionPool(
+        connection_class=FakeConnection,
+        server=fakeredis.FakeServer(),
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        decode_responses=True
+    )
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(pct / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def sign_webhook(payload: str) -> str:
+    timestamp = int(time.time())
+    signature = hmac.new(WEBHOOK_SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class ScenarioComplete(Exception):
+    pass
+
+
+class Recorder:
+    def __init__(self, target: int):
+        self.target = target
+        self.latencies = []
+        self.errors = 0
+        self.issued = 0
+
+    def claim(self) -> bool:
+        if self.issued >= self.target:
+            return False
+        self.issued += 1
+        return True
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "duration_s": round(elapsed, 3),
+            "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3)
+        }
+
+
+class VirtualUser:
+    def __init__(self, client, recorder: Recorder, headers: dict, context: dict, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.headers = headers
+        self.context = context
+        self.rng = rng
+
+    async def call(self, method: str, url: str, **kwargs):
+        if not self.recorder.claim():
+            raise ScenarioComplete
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.recorder.latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.recorder.errors += 1
+        return response
+
+    def product_id(self) -> int:
+        return self.rng.choice(self.context["product_ids"])
+
+
+async def browse(user: VirtualUser):
+    category_id = user.rng.choice(user.context["category_ids"])
+    await user.call("GET", "/api/v1/products", params={"limit": 20, "category_id": category_id})
+    await user.call("GET", f"/api/v1/products/{user.product_id()}")
+    await user.call("GET", "/api/v1/products/categories/list")
+
+
+async def search(user: VirtualUser):
+    await user.call("GET", "/api/v1/products", params={"search": user.rng.choice(SEARCH_WORDS), "limit": 20})
+
+
+async def cart(user: VirtualUser):
+    await user.call("POST", "/api/v1/cart/items", json={"product_id": user.product_id(), "quantity": 1}, headers=user.headers)
+    await user.call("GET", "/api/v1/cart", headers=user.headers)
+
+
+async def checkout(user: VirtualUser):
+    await user.call("POST", "/api/v1/cart/items", json={"product_id": user.product_id(), "quantity": 1}, headers=user.headers)
+    response = await user.call("POST", "/api/v1/orders", headers=user.headers)
+    if response.status_code == 201:
+        user.context["order_ids"].append(response.json()["id"])
+
+
+async def webhook_burst(user: VirtualUser):
+    context = user.context
+    context["event_seq"] += 1
+    order_id = user.rng.choice(context["order_ids"]) if context["order_ids"] else 0
+    payload = json.dumps({
+        "id": f"evt_bench_{context['event_seq']}",
+        "object": "event",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {"id": f"pi_bench_{order_id}", "object": "payment_intent", "metadata": {"order_id": str(order_id)}}}
+    })
+    await user.call(
+        "POST", "/api/v1/payments/webhook",
+        content=payload,
+        headers={"stripe-signature": sign_webhook(payload), "content-type": "application/json"}
+    )
+
+
+SCENARIO_FUNCTIONS = {
+    "browse": browse,
+    "search": search,
+    "cart": cart,
+    "checkout": checkout,
+    "webhook_burst": webhook_burst,
+}
+
+
+async def seed(product_count: int, user_count: int) -> dict:
+    from sqlalchemy import insert, select
+    from app.db.base import Base, Category, Product, User
+    from app.db.session import engine, AsyncSessionLocal
+    from app.core.security import create_access_token
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(0)
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Category), [{"name": f"Category {i}"} for i in range(CATEGORY_COUNT)])
+        category_ids = (await db.execute(select(Category.id))).scalars().all()
+        await db.execute(insert(Product), [
+            {
+                "sku": f"LOAD-{i}",
+                "name": f"{rng.choice(SEARCH_WORDS).title()} product {i}",
+                "description": f"A {rng.choice(SEARCH_WORDS)} {rng.choice(SEARCH_WORDS)} item",
+                "price": Decimal(rng.randint(100, 10000)) / 100,
+                "stock": 1_000_000,
+                "category_id": rng.choice(category_ids)
+            }
+            for i in range(product_count)
+        ])
+        await db.execute(insert(User), [
+            {"email": f"load{i}@example.com", "password_hash": "x", "is_active": True}
+            for i in range(user_count)
+        ])
+        product_ids = (await db.execute(select(Product.id))).scalars().all()
+        user_ids = (await db.execute(select(User.id).order_by(User.id))).scalars().all()
+        await db.commit()
+
+    return {
+        "category_ids": list(category_ids),
+        "product_ids": list(product_ids),
+        "tokens": [create_access_token(data={"sub": str(user_id)}) for user_id in user_ids],
+        "order_ids": [],
+        "event_seq": 0
+    }
+
+
+async def run_scenario(client, name: str, context: dict, requests: int, concurrency: int, seed_value: int) -> dict:
+    recorder = Recorder(requests)
+    scenario = SCENARIO_FUNCTIONS[name]
+
+    async def worker(index: int):
+        user = VirtualUser(
+            client, recorder,
+            {"Authorization": f"Bearer {context['tokens'][index]}"},
+            context, random.Random(seed_value + index)
+        )
+        try:
+            while True:
+                await scenario(user)
+        except ScenarioComplete:
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return recorder.summary(time.perf_counter() - start)
+
+
+async def wait_for_webhooks(timeout: float = 30.0) -> float:
+    from sqlalchemy import select, func
+    from app.db.models.payment_event import StripeEvent
+    from app.db.session import AsyncSessionLocal
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        async with AsyncSessionLocal() as db:
+            pending = (await db.execute(
+                select(func.count()).select_from(StripeEvent).where(StripeEvent.status == "pending")
+            )).scalar_one()
+        if not pending:
+            break
+        await asyncio.sleep(0.05)
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+async def run(args) -> dict:
+    install_fake_redis()
+    from httpx import AsyncClient, ASGITransport
+    from app.main import app
+    from app.db.session import engine
+
+    context = await seed(args.products, args.concurrency)
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for name in args.scenarios:
+                if args.warmup:
+                    await run_scenario(client, name, context, args.warmup, args.concurrency, args.seed + 1000)
+                results[name] = await run_scenario(client, name, context, args.requests, args.concurrency, args.seed)
+                if name == "webhook_burst":
+                    results[name]["drain_ms"] = await wait_for_webhooks()
+                print(format_row(name, results[name]), flush=True)
+    await engine.dispose()
+
+    return {
+        "meta": {
+            "commit": current_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "products": args.products,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed
+        },
+        "scenarios": results
+    }
+
+
+def format_row(name: str, summary: dict) -> str:
+    return (
+        f"{name:>14} {summary['requests']:>8} {summary['errors']:>6} {summary['rps']:>9.1f}"
+        f" {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}"
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    print(f"\nagainst {baseline['meta'].get('commit', '?')} (regression threshold {threshold:.0%})")
+    print(f"{'scenario':>14} {'metric':>7} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressed = False
+    for name, summary in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)):
+            before, after = previous[metric], summary[metric]
+            change = (after - before) / before if before else 0.0
+            worse = change < -threshold if higher_is_better else change > threshold
+            regressed = regressed or worse
+            marker = "  REGRESSION" if worse else ""
+            print(f"{name:>14} {metric:>7} {before:>10.2f} {after:>10.2f} {change:>+7.1%}{marker}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted load scenarios against the API on SQLite and fakeredis")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50, help="unrecorded requests per scenario")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(workdir)
+        print(f"{'scenario':>14} {'requests':>8} {'errors':>6} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        result = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, result, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
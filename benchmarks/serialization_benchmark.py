@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.db.base import Product, Order, OrderItem
+from app.schemas.product import ProductResponse
+from app.schemas.order import OrderResponse
+from app.core.serialization import JSONRowsResponse, jsonable_rows
+
+
+def build_products(rows: int):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    dicts = [
+        {
+            "sku": f"SKU-{i}",
+            "name": f"Product {i}",
+            "description": "A product used to measure response serialization",
+            "price": Decimal("19.99") + i,
+            "stock": i,
+            "category_id": i % 10 or None,
+            "image_url": None,
+            "id": i + 1,
+            "created_at": now + timedelta(minutes=i),
+            "updated_at": None
+        }
+        for i in range(rows)
+    ]
+    return [Product(**row) for row in dicts], dicts
+
+
+def build_orders(rows: int, items_per_order: int):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    orders, dicts = [], []
+    for i in range(rows):
+        items = [
+            {"id": i * items_per_order + j + 1, "product_id": j + 1, "quantity": j + 1, "unit_price": Decimal("5.25")}
+            for j in range(items_per_order)
+        ]
+        row = {
+            "id": i + 1,
+            "user_id": 1,
+            "total_amount": Decimal("5.25") * items_per_order,
+            "status": "paid",
+            "payment_intent_id": f"pi_{i}",
+            "created_at": now - timedelta(minutes=i)
+        }
+        orders.append(Order(**row, items=[OrderItem(**item) for item in items]))
+        dicts.append({**row, "items": items})
+    return orders, dicts
+
+
+def time_it(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1_000_000 / iterations
+
+
+def run(rows: int, items_per_order: int, iterations: int):
+    products, product_rows = build_products(rows)
+    orders, order_rows = build_orders(rows, items_per_order)
+    product_field = create_response_field("Response_list_products", List[ProductResponse], mode="serialization")
+    order_field = create_response_field("Response_list_orders", List[OrderResponse], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def response_model_path(field, content):
+        # What FastAPI does for response_model: validate, dump, then encode with the stdlib encoder.
+        data = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return JSONResponse(data).body
+
+    def products_orm():
+        content = [ProductResponse.model_validate(product).model_dump(mode="json") for product in products]
+        return response_model_path(product_field, content)
+
+    def products_rows():
+        return JSONRowsResponse(jsonable_rows(product_rows)).body
+
+    def orders_orm():
+        return response_model_path(order_field, orders)
+
+    def orders_rows():
+        return JSONRowsResponse(order_rows).body
+
+    print(f"{rows} rows per page, {items_per_order} items per order, mean of {iterations} runs")
+    print(f"{'listing':>10} {'orm us':>10} {'rows us':>10} {'speedup':>8}")
+    for name, orm_fn, rows_fn in (
+        ("products", products_orm, products_rows),
+        ("orders", orders_orm, orders_rows),
+    ):
+        if json.loads(orm_fn()) != json.loads(rows_fn()):
+            raise SystemExit(f"{name}: fast path output differs from the response_model path")
+        orm_us = time_it(orm_fn, iterations)
+        rows_us = time_it(rows_fn, iterations)
+        print(f"{name:>10} {orm_us:>10.1f} {rows_us:>10.1f} {orm_us / rows_us:>7.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="response_model serialization vs row-based JSON rendering")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    run(args.rows, args.items_per_order, args.iterations)
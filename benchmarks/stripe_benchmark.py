@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import threading
+import time
+
+import stripe
+import uvicorn
+
+from app.services.stripe_gateway import StripeGateway
+from app.tests.fake_stripe import create_fake_stripe_app
+
+
+def start_fake_stripe(port: int, latency: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        create_fake_stripe_app(latency=latency), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def blocking_client(api_base: str, count: int):
+    stripe.api_key = "sk_test_fake"
+    stripe.api_base = api_base
+
+    async def create(order_id: int):
+        stripe.PaymentIntent.create(
+            amount=1000, currency="usd", metadata={"order_id": str(order_id)},
+            idempotency_key=f"blocking-{order_id}"
+        )
+
+    await asyncio.gather(*[create(order_id) for order_id in range(count)])
+
+
+async def async_gateway(api_base: str, count: int, concurrency: int):
+    gateway = StripeGateway(api_key="sk_test_fake", api_base=api_base, max_concurrency=concurrency)
+    await asyncio.gather(*[
+        gateway.create_payment_intent(1000, "usd", {"order_id": str(order_id)}, f"async-{order_id}")
+        for order_id in range(count)
+    ])
+    await gateway.close()
+
+
+async def run(count: int, latency: float, concurrency: int, port: int):
+    server = start_fake_stripe(port, latency)
+    api_base = f"http://127.0.0.1:{port}"
+
+    print(f"{count} payment intents, fake Stripe latency {latency * 1000:.0f} ms")
+    for name, coro in (
+        ("blocking stripe-python", blocking_client(api_base, count)),
+        (f"async gateway (limit {concurrency})", async_gateway(api_base, count, concurrency)),
+    ):
+        start = time.perf_counter()
+        await coro
+        elapsed = time.perf_counter() - start
+        print(f"{name:>28}: {elapsed:6.2f} s total, {count / elapsed:8.1f} intents/s")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blocking vs async Stripe PaymentIntent creation")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=12111)
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.latency, args.concurrency, args.port))